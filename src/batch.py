@@ -0,0 +1,146 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import utility as util
+from config import the
+from rng import RNG
+
+def grids(where):
+    """
+    Function:
+        grids
+    Description:
+        Finds the repgrid files to process
+    Input:
+        where - directory of .json files or a glob pattern
+    Output:
+        Sorted list of paths
+    """
+    if os.path.isdir(where):
+        where = os.path.join(where, "*.json")
+    return sorted(glob.glob(where))
+
+def digest(sFile, seed, p):
+    """
+    Function:
+        digest
+    Description:
+        Hashes a grid's content together with the settings its results depend on
+    Input:
+        sFile - path of a repgrid .json file
+        seed - random number seed
+        p - distance coefficient
+    Output:
+        Hex digest
+    """
+    with open(sFile, "rb") as f:
+        return hashlib.sha256(f.read() + f"|{seed}|{p}".encode()).hexdigest()
+
+def tree(node):
+    """
+    Function:
+        tree
+    Description:
+        Turns a cluster tree into nested dictionaries, leaves are named by their row's label
+    Input:
+        node - cluster tree NODE
+    Output:
+        Nested dictionary of the tree
+    """
+    if "left" not in node:
+        return {"leaf": util.last(util.last(node["data"].rows).cells)}
+    return {"C": node["C"], "left": tree(node["left"]), "right": tree(node.get("right"))}
+
+def share(config):
+    """
+    Function:
+        share
+    Description:
+        Starts a batch worker process off with the settings of the parent process
+    Input:
+        config - CONFIG of the parent process
+    Output:
+        None
+    """
+    the.update(config)
+
+def process(sFile, seed):
+    """
+    Function:
+        process
+    Description:
+        Clusters the rows and cols of one repgrid file and places its rows in 2d.
+        Any failure is caught and returned so it does not stop the batch
+    Input:
+        sFile - path of a repgrid .json file
+        seed - random number seed
+    Output:
+        Dictionary of the results, or of the error
+    """
+    start = time.perf_counter()
+    try:
+        t = util.dofile(sFile)
+        rows, cols = util.repViews(t)
+        root = rows.cluster(rng=RNG(seed))
+        xy = root.xy().tolist()
+        out = {"file": sFile, "rows": tree(root), "cols": tree(cols.cluster(rng=RNG(seed))),
+               "place": [{"label": util.last(row.cells), "x": xy[row.i][0], "y": xy[row.i][1]} for row in rows.rows]}
+    except Exception as e:
+        out = {"file": sFile, "error": f"{type(e).__name__}: {e}"}
+    out["seconds"] = time.perf_counter() - start
+    return out
+
+def run(where, sOut, workers = 4, seed = 937162211):
+    """
+    Function:
+        run
+    Description:
+        Processes many repgrid files in a process pool and writes one json line per grid to sOut.
+        Grids whose content hash matches a result already in sOut are not processed again
+    Input:
+        where - directory of .json files or a glob pattern
+        sOut - path of the json lines file to write
+        workers - number of worker processes
+        seed - random number seed used for every grid
+    Output:
+        Dictionary with counts of grids done, skipped and failed, and grids per second
+    """
+    start = time.perf_counter()
+    old = {}
+    if os.path.exists(sOut):
+        with open(sOut) as f:
+            for line in f:
+                t = json.loads(line)
+                if "error" not in t:
+                    old[t["file"], t["hash"]] = t
+    files = grids(where)
+    hashes = {sFile: digest(sFile, seed, the.p) for sFile in files}
+    todo = [sFile for sFile in files if (sFile, hashes[sFile]) not in old]
+    results = {}
+    if todo:
+        with ProcessPoolExecutor(workers, initializer=share, initargs=(the,)) as pool:
+            for t in pool.map(process, todo, [seed] * len(todo)):
+                t["hash"] = hashes[t["file"]]
+                results[t["file"]] = t
+    with open(sOut, "w") as f:
+        for sFile in files:
+            f.write(json.dumps(results.get(sFile) or old[sFile, hashes[sFile]]) + "\n")
+    seconds = time.perf_counter() - start
+    return {"done": len(todo), "skipped": len(files) - len(todo),
+            "failed": sum(1 for t in results.values() if "error" in t),
+            "seconds": seconds, "rate": len(todo) / seconds if seconds else 0}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="cluster many repgrid files")
+    parser.add_argument("where", type=str, help="directory or glob of repgrid .json files")
+    parser.add_argument("-o", "--out", type=str, default="repgrids.jsonl", help="json lines file to write")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="number of worker processes")
+    parser.add_argument("-s", "--seed", type=int, default=937162211, help="random number seed")
+    parser.add_argument("-p", "--p", type=int, default=2, help="distance coefficient")
+    args = parser.parse_args()
+    the.update(args)
+    print(run(args.where, args.out, args.workers, args.seed))
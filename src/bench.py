@@ -0,0 +1,180 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import utility as util
+from data import DATA
+from index import INDEX
+from rng import RNG
+
+script_dir = os.path.dirname(__file__)
+
+IMPORTS = ["data", "testfile"]
+STEPS = {"data": lambda t, data, seed: DATA(t),
+         "dist": lambda t, data, seed: [data.dist(data.rows[0], row2) for row2 in data.rows],
+         "around": lambda t, data, seed: data.around(data.rows[0]),
+         "half": lambda t, data, seed: data.half(rng=RNG(seed)),
+         "cluster": lambda t, data, seed: DATA(t).cluster(rng=RNG(seed)),
+         "sway": lambda t, data, seed: DATA(t).sway(rng=RNG(seed)),
+         "index": lambda t, data, seed: INDEX(data, rng=RNG(seed)).build().queries(data.rows[:100], 5)}
+TABLES = ["synthetic", "auto93"]
+REPGRIDS = ["repgrid1.json", "repgrid_connor.json"]
+SUITE = (["import." + module for module in IMPORTS] + [table + "." + step for table in TABLES for step in STEPS]
+         + ["repgrid." + sFile for sFile in REPGRIDS])
+
+def synthetic(rows = 1000, nums = 4, syms = 2, missing = 0, seed = 937162211):
+    """
+    Function:
+        synthetic
+    Description:
+        Makes a random table with NUM and SYM x columns and two NUM y columns
+    Input:
+        rows - number of rows
+        nums - number of NUM x columns
+        syms - number of SYM x columns
+        missing - fraction of x cells that are "?"
+        seed - random number seed
+    Output:
+        List of rows, the first one is the header
+    """
+    rng = RNG(seed)
+    t = [["Num" + str(k) for k in range(nums)] + ["sym" + str(k) for k in range(syms)] + ["Lbs-", "Mpg+"]]
+    for _ in range(rows):
+        u = [round(rng.rand(0, 100), 2) for _ in range(nums)] + ["abcde"[rng.rint(0, 4)] for _ in range(syms)]
+        u = ["?" if rng.rand() < missing else x for x in u]
+        t.append(u + [round(rng.rand(1000, 5000)), round(rng.rand(10, 50), 1)])
+    return t
+
+def timeit(fun, repeats = 3):
+    """
+    Function:
+        timeit
+    Description:
+        Times a function, keeping the best of several runs and hiding anything it prints
+    Input:
+        fun - function to time
+        repeats - number of runs
+    Output:
+        Fastest run in seconds
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fun()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+def importTime(module, repeats = 3):
+    """
+    Function:
+        importTime
+    Description:
+        Times importing a module in a fresh interpreter, keeping the best of several runs
+    Input:
+        module - name of a module in the src directory
+        repeats - number of runs
+    Output:
+        Fastest import in seconds
+    """
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    return min(float(subprocess.run([sys.executable, "-c", code], cwd=script_dir or ".", capture_output=True,
+                                    text=True, check=True).stdout.split()[-1]) for _ in range(repeats))
+
+def suite(t, name, repeats = 3, seed = 937162211):
+    """
+    Function:
+        suite
+    Description:
+        Times each step of the clustering pipeline, and an INDEX built and queried, on one table
+    Input:
+        t - DATA source, a csv path or a list of rows with a header
+        name - prefix of the result names
+        repeats - number of runs per step
+        seed - random number seed
+    Output:
+        Dictionary of step name to seconds
+    """
+    data = DATA(t)
+    return {name + "." + k: timeit(lambda: fun(t, data, seed), repeats) for k, fun in STEPS.items()}
+
+def run(rows = 1000, nums = 4, syms = 2, missing = 0.05, repeats = 3, seed = 937162211):
+    """
+    Function:
+        run
+    Description:
+        Runs the benchmark suite on a synthetic table, auto93.csv and the repgrid files, after timing
+        the library (data) and CLI (testfile) imports
+    Input:
+        rows - rows in the synthetic table
+        nums - NUM x columns in the synthetic table
+        syms - SYM x columns in the synthetic table
+        missing - fraction of "?" cells in the synthetic table
+        repeats - number of runs per step
+        seed - random number seed
+    Output:
+        Dictionary with the settings and the seconds per step
+    """
+    results = {"import." + module: importTime(module, repeats) for module in IMPORTS}
+    results.update(suite(synthetic(rows, nums, syms, missing, seed), "synthetic", repeats, seed))
+    results.update(suite(os.path.join(script_dir, "../etc/data/auto93.csv"), "auto93", repeats, seed))
+    for sFile in REPGRIDS:
+        path = os.path.join(script_dir, "../etc/data", sFile)
+        results["repgrid." + sFile] = timeit(lambda: util.repgrid(path), repeats)
+    return {"meta": {"rows": rows, "nums": nums, "syms": syms, "missing": missing, "repeats": repeats,
+                     "seed": seed, "python": platform.python_version(), "numpy": np.__version__,
+                     "when": time.strftime("%Y-%m-%d %H:%M:%S")},
+            "results": results}
+
+def compare(old, new, tolerance = 0.2):
+    """
+    Function:
+        compare
+    Description:
+        Compares two benchmark runs step by step
+    Input:
+        old - earlier result of run
+        new - later result of run
+        tolerance - how much slower a step may get before it is flagged, as a fraction
+    Output:
+        List of (step, old seconds, new seconds, ratio, flagged) for steps in both runs
+    """
+    out = []
+    for k, t in new["results"].items():
+        if k in old["results"]:
+            ratio = t / old["results"][k] if old["results"][k] else 1
+            out.append((k, old["results"][k], t, ratio, ratio > 1 + tolerance))
+    return out
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmark the clustering pipeline")
+    parser.add_argument("-r", "--rows", type=int, default=1000, help="rows in the synthetic table")
+    parser.add_argument("-n", "--nums", type=int, default=4, help="NUM columns in the synthetic table")
+    parser.add_argument("-y", "--syms", type=int, default=2, help="SYM columns in the synthetic table")
+    parser.add_argument("-m", "--missing", type=float, default=0.05, help="fraction of missing cells")
+    parser.add_argument("-k", "--repeats", type=int, default=3, help="runs per step")
+    parser.add_argument("-s", "--seed", type=int, default=937162211, help="random number seed")
+    parser.add_argument("-o", "--out", type=str, default="bench.json", help="json file to write results to")
+    parser.add_argument("-c", "--compare", type=str, default=None, help="earlier results to compare against")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.2, help="allowed slowdown before flagging")
+    args = parser.parse_args()
+    new = run(args.rows, args.nums, args.syms, args.missing, args.repeats, args.seed)
+    with open(args.out, "w") as f:
+        json.dump(new, f, indent=2)
+    slower = False
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        for k, t1, t2, ratio, flag in compare(old, new, args.tolerance):
+            slower = slower or flag
+            print(f"{k:32} {t1:10.5f} {t2:10.5f} {ratio:6.2f}x {'SLOWER' if flag else ''}")
+    else:
+        for k, t in new["results"].items():
+            print(f"{k:32} {t:10.5f}")
+    sys.exit(1 if slower else 0)
@@ -0,0 +1,112 @@
+import numpy as np
+from num import NUM
+
+class CACHE:
+    def __init__(self, budget = 0):
+        self.budget = budget
+        self.key = None
+        self.rows = None
+        self.pos = None
+        self.d = None
+        self.n = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        """
+        Function:
+            __getstate__
+        Description:
+            Leaves the distances out when a DATA is pickled, say for cluster workers, so they are
+            not copied to every process. The unpickled CACHE builds them again if it is used
+        Input:
+            self - current CACHE instance
+        Output:
+            Dictionary of the budget and counters
+        """
+        return {**vars(self), "key": None, "rows": None, "pos": None, "d": None, "n": 0}
+
+    def fits(self, n):
+        """
+        Function:
+            fits
+        Description:
+            Checks if the distances between n rows fit in the memory budget
+        Input:
+            self - current CACHE instance
+            n - number of rows
+        Output:
+            True if the condensed matrix of n rows takes at most budget bytes
+        """
+        return 8 * n * (n + 1) // 2 <= self.budget
+
+    def matrix(self, data, cols):
+        """
+        Function:
+            matrix
+        Description:
+            Returns the condensed lower triangle (diagonal included) of distances between the rows
+            of data, not of its whole STORE, computing it the first time it is asked for, a block of
+            rows at a time with DATA.measures. Rows added later are appended to it, it is rebuilt
+            when data.rows is replaced or the cols, their lo and hi, or p change
+        Input:
+            self - current CACHE instance
+            data - DATA the distances belong to
+            cols - cols the distances are measured on
+        Output:
+            Array of distances, None if the rows do not fit the budget
+        """
+        rows, n = data.rows, len(data.rows)
+        key = (tuple(col.at for col in cols), data.config.p,
+               tuple((col.lo, col.hi) for col in cols if isinstance(col, NUM)))
+        if key != self.key or rows is not self.rows or n < self.n:
+            self.key, self.rows, self.pos, self.d, self.n = key, rows, np.zeros(0, dtype=np.int64), np.zeros(0), 0
+        if n > self.n:
+            if not self.fits(n):
+                self.key, self.rows, self.pos, self.d, self.n = None, None, None, None, 0
+                return None
+            size = n * (n + 1) // 2
+            if len(self.d) < size:
+                d = np.empty(max(size, 2 * len(self.d)))
+                d[:len(self.d)] = self.d
+                self.d = d
+            pos = np.full(data.store.n, -1, dtype=np.int64)
+            pos[:len(self.pos)] = self.pos
+            self.pos = pos
+            self.pos[np.fromiter((row.i for row in rows[self.n:n]), dtype=np.int64, count=n - self.n)] = np.arange(self.n, n)
+            lo = self.n
+            while lo < n:
+                hi = min(n, lo + max(1, 2 ** 20 // n))
+                below = np.arange(hi)[None, :] <= np.arange(lo, hi)[:, None]
+                self.d[lo * (lo + 1) // 2:hi * (hi + 1) // 2] = data.measures(rows[lo:hi], rows[:hi], cols)[below]
+                lo = hi
+            self.n = n
+        return self.d
+
+    def get(self, data, row1, rows, cols):
+        """
+        Function:
+            get
+        Description:
+            Looks up the distances from row1 to rows, when all of them are rows of data
+        Input:
+            self - current CACHE instance
+            data - DATA the distances belong to
+            row1 - Central row
+            rows - Rows to look up the distance to
+            cols - cols the distances are measured on
+        Output:
+            Array of distances, None if they are not cached
+        """
+        if row1.store is data.store and self.budget:
+            d = self.matrix(data, cols)
+            if d is not None:
+                idx = np.fromiter((row.i for row in rows), dtype=np.int64, count=len(rows))
+                if row1.i < len(self.pos) and (idx < len(self.pos)).all():
+                    i, idx = self.pos[row1.i], self.pos[idx]
+                    if i >= 0 and (idx >= 0).all():
+                        a, b = np.maximum(i, idx), np.minimum(i, idx)
+                        self.hits += len(idx)
+                        return d[a * (a + 1) // 2 + b]
+        self.misses += len(rows)
+        return None
@@ -33,4 +33,21 @@ class COLS:
         """
         for t in [self.x, self.y]:
             for col in t:
-                col.add(row.cells[col.at])
+                col.add(row.cell(col.at))
+
+    def merge(self, other):
+        """
+        Function:
+            merge
+        Description:
+            Folds the column summaries of another COLS with the same names into this one
+        Input:
+            self - current COLS instance
+            other - COLS to merge in
+        Output:
+            self
+        """
+        for t, u in [(self.x, other.x), (self.y, other.y)]:
+            for col, col2 in zip(t, u):
+                col.merge(col2)
+        return self
@@ -0,0 +1,25 @@
+class CONFIG:
+    def __init__(self, p = 2, min = 0.5, seed = 937162211, cache = 0):
+        self.p = p
+        self.min = min
+        self.seed = seed
+        self.cache = cache
+
+    def update(self, other):
+        """
+        Function:
+            update
+        Description:
+            Copies the settings of another CONFIG, or of parsed CLI args, that this CONFIG knows about
+        Input:
+            self - current CONFIG instance
+            other - CONFIG or argparse Namespace
+        Output:
+            self
+        """
+        for k in vars(self):
+            if hasattr(other, k):
+                setattr(self, k, getattr(other, k))
+        return self
+
+the = CONFIG()
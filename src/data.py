@@ -1,19 +1,68 @@
 import math
-import testfile as test
-from row import ROW
+import sys
+import numpy as np
+import lib
+from config import the
 from cols import COLS
-import utility as util
+from store import STORE
+from node import NODE
+from cache import CACHE
 from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+shared = None
+
+def share(data):
+    """
+    Function:
+        share
+    Description:
+        Starts a cluster worker process off with the DATA being clustered, which carries its CONFIG
+    Input:
+        data - DATA being clustered
+    Output:
+        None
+    """
+    global shared
+    shared = data
+
+def clusterTask(idx, at, above, rng, poles):
+    """
+    Function:
+        clusterTask
+    Description:
+        Clusters one subtree inside a worker process
+    Input:
+        idx - STORE indices of the subtree's rows, in order
+        at - column indices to cluster on
+        above - STORE index of the pole above the subtree
+        rng - RNG for the subtree
+        poles - list of (STORE index of a pole, distances from it to the subtree's rows) from the splits above
+    Output:
+        Row order, tree shape and the coords of the subtree's rows after clustering, and how much
+        the subtree added to the pruned and tasks counters, which the parent adds to its own
+    """
+    pruned, tasks = shared.pruned, shared.tasks
+    rows = [shared.store.rows[i] for i in idx]
+    poles = [(shared.store.rows[i], d) for i, d in poles]
+    node = shared.cluster(rows, [shared.cols.all[k] for k in at], shared.store.rows[above], rng = rng, poles = poles)
+    return node.order.tolist(), node.dump(), node.coords[node.order], shared.pruned - pruned, shared.tasks - tasks
 
 class DATA:
 
-    def __init__(self, src):
+    def __init__(self, src, store = None, config = None):
         self.rows = []
         self.cols = None
+        self.store = store
+        self.config = config or the
+        self.cache = CACHE(self.config.cache)
+        self.tree = None
+        self.pruned = 0
+        self.tasks = 0
         # self.halfCalls = 0
         fun = lambda x: self.add(x)
         if type(src) == str:
-            test.readCSV(src, fun)
+            lib.readCSV(src, fun)
         else:
             for row in src:
                 self.add(row)
@@ -31,30 +80,71 @@ class DATA:
             None
         """
         if self.cols:
-            t = t if hasattr(t, "cells") else ROW(t)
+            if not (hasattr(t, "store") and t.store is self.store):
+                t = self.store.append(t.cells if hasattr(t, "cells") else t)
             self.rows.append(t)
             self.cols.add(t)
         else:
             self.cols = COLS(t)
+            if self.store is None:
+                self.store = STORE(self.cols)
+
+    def adopt(self, columns):
+        """
+        Function:
+            adopt
+        Description:
+            Adds whole columns of rows at once through STORE.adopt and summarises them with addMany
+        Input:
+            self - current DATA instance
+            columns - one array or list of raw cells per column, all the same length
+        Output:
+            None
+        """
+        rows = self.store.adopt(columns)
+        self.rows.extend(rows)
+        if rows:
+            for col in self.cols.x + self.cols.y:
+                if self.store.isNum[col.at]:
+                    col.addMany(self.store.column(col.at)[rows[0].i:])
+                else:
+                    col.addMany(list(columns[col.at]))
 
     def clone(self, rows = None):
         """
         Function:
             clone
         Description:
-            Creates a clone of the DATA object and returns it
+            Creates a clone of the DATA object and returns it. The clone shares this DATA's STORE so rows are not copied
         Input:
             self - current DATA instance
-            init - init counter
-            x - data to be cloned
+            rows - rows to add to the clone
         Output:
             data - Clone of DATA object
         """
-        data = DATA([self.cols.names])
+        data = DATA([self.cols.names], self.store, self.config)
         for row in rows:
             data.add(row)
         return data
 
+    def merge(self, other):
+        """
+        Function:
+            merge
+        Description:
+            Creates a DATA holding the rows of this DATA and another one over the same STORE,
+            merging their column summaries instead of re-adding the rows
+        Input:
+            self - current DATA instance
+            other - DATA sharing this DATA's STORE
+        Output:
+            data - DATA of both sets of rows
+        """
+        data = DATA([self.cols.names], self.store, self.config)
+        data.rows = self.rows + other.rows
+        data.cols.merge(self.cols).merge(other.cols)
+        return data
+
     def stats(self, what, cols, nPlaces, fun=None):
         """
         Function:
@@ -73,7 +163,47 @@ class DATA:
             mid = getattr(col, what or "mid")
             rounded = round(float(mid()), nPlaces)
             return (rounded, col.txt)
-        return test.kap(cols or self.cols.y, fun)
+        return lib.kap(cols or self.cols.y, fun)
+
+    def memory(self):
+        """
+        Function:
+            memory
+        Description:
+            Estimates the bytes this DATA holds, with sys.getsizeof for objects and nbytes for arrays. The
+            STORE is counted in full even when it is shared with other DATAs, array views count their own size
+        Input:
+            self - current DATA instance
+        Output:
+            Dictionary of bytes used by rows (the ROW objects and the list of them), cells (the STORE's
+            arrays and symbol dictionaries), cols (NUM and SYM summaries), tree (nodes of self.tree, their
+            row order and any summaries built for them), cache (distances) and their total
+        """
+        def summaries(data):
+            n = sys.getsizeof(data.rows) + sys.getsizeof(data.cols.all)
+            for col in data.cols.all:
+                n += sys.getsizeof(col) + sys.getsizeof(col.txt) + (0 if hasattr(col, "mu") else sys.getsizeof(col.has))
+            return n
+        store = self.store
+        out = {"rows": sys.getsizeof(self.rows) + sum(sys.getsizeof(row) for row in self.rows)}
+        out["cells"] = sum(t.nbytes for t in list(store.num.values()) + list(store.sym.values()) + list(store.miss.values()))
+        for at in store.codes:
+            out["cells"] += sys.getsizeof(store.codes[at]) + sys.getsizeof(store.values[at]) + \
+                sum(sys.getsizeof(x) for x in store.values[at])
+        out["cols"] = summaries(self) - sys.getsizeof(self.rows)
+        out["tree"], todo = 0, [self.tree] if self.tree is not None else []
+        if todo:
+            out["tree"] += self.tree.order.nbytes
+        while todo:
+            node = todo.pop()
+            out["tree"] += sys.getsizeof(node) + sys.getsizeof(vars(node)) + sys.getsizeof(node.extra)
+            out["tree"] += node.grid.nbytes if node.grid is not None else 0
+            if node.cache is not None:
+                out["tree"] += summaries(node.cache)
+            todo += [kid for kid in (node.left, node.right) if kid is not None]
+        out["cache"] = self.cache.d.nbytes if self.cache.d is not None else 0
+        out["total"] = sum(out.values())
+        return out
 
     def better(self, row1, row2):
         """
@@ -90,12 +220,57 @@ class DATA:
         """
         s1, s2, ys = 0, 0, self.cols.y
         for _, col in enumerate(ys):
-            x = col.norm(row1.cells[col.at])
-            y = col.norm(row2.cells[col.at])
+            x = col.norm(row1.cell(col.at))
+            y = col.norm(row2.cell(col.at))
             s1 -= math.exp(col.w * (((x - y)) / len(ys)))
             s2 -= math.exp(col.w * ((y - x) / len(ys)))
         return (s1 / len(ys)) < (s2 / len(ys))
 
+    def betters(self, rows = None, others = None):
+        """
+        Function:
+            betters
+        Description:
+            Vectorized better between every row in rows and every row in others, with array ops
+            over the normalised y columns weighted by each column's w
+        Input:
+            self - current DATA instance
+            rows - rows to compare, all rows by default
+            others - rows to compare them to, rows by default
+        Output:
+            Boolean matrix that is True at [i, j] if rows[i] dominates others[j]
+        """
+        rows = self.rows if rows is None else rows
+        others = rows if others is None else others
+        i = np.fromiter((row.i for row in rows), dtype=np.int64, count=len(rows))
+        j = np.fromiter((row.i for row in others), dtype=np.int64, count=len(others))
+        s1, s2, ys = np.zeros((len(i), len(j))), np.zeros((len(i), len(j))), self.cols.y
+        for col in ys:
+            column = (self.store.column(col.at) - col.lo) / (col.hi - col.lo + 1 + 10 ** (-32))
+            d = column[i][:, None] - column[j][None, :]
+            s1 -= np.exp(col.w * (d / len(ys)))
+            s2 -= np.exp(col.w * (-d / len(ys)))
+        return (s1 / len(ys)) < (s2 / len(ys))
+
+    def rank(self, rows = None, block = 1024):
+        """
+        Function:
+            rank
+        Description:
+            Ranks rows by how many of the other rows they dominate, working through betters a
+            block of rows at a time so memory stays at block times the number of rows
+        Input:
+            self - current DATA instance
+            rows - rows to rank, all rows by default
+            block - number of rows compared to all the others at once
+        Output:
+            List of (row, number of rows it dominates), most dominant first
+        """
+        rows = self.rows if rows is None else list(rows)
+        wins = np.concatenate([self.betters(rows[lo:lo + block], rows).sum(axis=1)
+                               for lo in range(0, len(rows), block)] or [np.zeros(0, dtype=int)])
+        return [(rows[k], int(wins[k])) for k in np.argsort(-wins, kind="stable")]
+
     def dist(self, row1, row2, cols = None):
         """
         Function:
@@ -110,11 +285,81 @@ class DATA:
         Output:
             Normalized distance between row1 and row2
         """
+        cols = cols or self.cols.x
+        if self.cache.budget and row2.store is self.store:
+            d = self.cache.get(self, row1, [row2], cols)
+            if d is not None:
+                return float(d[0])
         n, d = 0, 0
         for col in (cols or self.cols.x):
             n += 1
-            d += col.dist(row1.cells[col.at], row2.cells[col.at]) ** util.args.p
-        return (d / n) ** (1 / util.args.p)
+            d += col.dist(row1.cell(col.at), row2.cell(col.at)) ** self.config.p
+        return (d / n) ** (1 / self.config.p)
+
+    def dists(self, row1, rows = None, cols = None):
+        """
+        Function:
+            dists
+        Description:
+            Finds normalized distance between row1 and a whole block of rows in one vectorized pass over the STORE
+        Input:
+            self - current DATA instance
+            row1 - Central row
+            rows - Rows of this DATA's STORE to measure distance to
+            cols - cols to use as the data for distance
+        Output:
+            Array of distances from row1 to each of rows, equal to calling dist on every pair
+        """
+        rows = self.rows if rows is None else rows
+        cols = cols or self.cols.x
+        d = self.cache.get(self, row1, rows, cols) if self.cache.budget else None
+        return self.measure(row1, rows, cols) if d is None else d
+
+    def measure(self, row1, rows, cols):
+        """
+        Function:
+            measure
+        Description:
+            The vectorized distance kernel behind dists, without the CACHE
+        Input:
+            self - current DATA instance
+            row1 - Central row
+            rows - Rows of this DATA's STORE to measure distance to
+            cols - cols to use as the data for distance
+        Output:
+            Array of distances from row1 to each of rows
+        """
+        idx = np.fromiter((row.i for row in rows), dtype=np.int64, count=len(rows))
+        n, d = 0, np.zeros(len(idx))
+        for col in cols:
+            n += 1
+            column = self.store.column(col.at)
+            d += lib.power(col.dists(self.store.key(row1, col.at), column[idx]), self.config.p)
+        return lib.power(d / n, 1 / self.config.p)
+
+    def measures(self, rows1, rows, cols):
+        """
+        Function:
+            measures
+        Description:
+            The distance kernel for every pair of two blocks of rows at once, broadcasting one
+            block's column against the other's
+        Input:
+            self - current DATA instance
+            rows1 - Rows of this DATA's STORE
+            rows - Rows of this DATA's STORE to measure distance to
+            cols - cols to use as the data for distance
+        Output:
+            Array of distances with a row for each of rows1 and a column for each of rows
+        """
+        i = np.fromiter((row.i for row in rows1), dtype=np.int64, count=len(rows1))
+        j = np.fromiter((row.i for row in rows), dtype=np.int64, count=len(rows))
+        n, d = 0, np.zeros((len(i), len(j)))
+        for col in cols:
+            n += 1
+            column = self.store.column(col.at)
+            d += lib.power(col.dists(column[i][:, None], column[j][None, :]), self.config.p)
+        return lib.power(d / n, 1 / self.config.p)
 
     def around(self, row1, rows = None, cols = None):
         """
@@ -130,33 +375,71 @@ class DATA:
         Output:
             Sorted list of rows by their distance to row1
         """
-        if isinstance(rows, Iterable):
-            iterable = rows
-        else:
-            iterable = self.rows
-
-        rows_with_distance = [(row2, self.dist(row1, row2, cols)) for row2 in iterable]
-        sorted_rows = sorted(rows_with_distance, key=lambda x: x[1])
-        return [(row, dist) for row, dist in sorted_rows]
+        rows = list(rows) if isinstance(rows, Iterable) else self.rows
+        d = self.dists(row1, rows, cols)
+        ds = d.tolist()
+        return [(rows[k], ds[k]) for k in np.argsort(d, kind="stable")]
 
-    def furthest(self, row1, rows, cols = None):
+    def furthest(self, row1, rows, cols = None, poles = None):
         """
         Function:
             furthest
         Description:
-            Finds and returns the furthest away row from row1
+            Finds and returns the furthest away row from row1 with a linear argmax. Ties go to the last row, like the tail of around.
+            With poles, each row's distance to row1 is bounded by the triangle inequality through every pole,
+            and rows whose upper bound is below the best lower bound are never measured. Missing values
+            break the triangle inequality, so poles are ignored when any of cols has a "?" cell
         Input:
             self - current DATA instance
             row1 - Central row to find furthest row from
             rows - Rows to compare to distance from row1
             cols - cols to use as the data for sorting by distance to row1
+            poles - list of (pole, distances from the pole to each of rows), as made by split
         Output:
             Furthest row from row1
         """
-        t = self.around(row1, rows, cols)
-        return t[-1][0]
+        rows = list(rows) if isinstance(rows, Iterable) else self.rows
+        if poles and (row1.store is not self.store or
+                      any(self.store.mask(col.at).any() for col in cols or self.cols.x)):
+            poles = None
+        if not poles:
+            d = self.dists(row1, rows, cols)
+            return rows[len(d) - 1 - int(np.argmax(d[::-1]))]
+        gaps = self.dists(row1, [pole for pole, _ in poles], cols)
+        lower = np.max([np.abs(d - gap) for (_, d), gap in zip(poles, gaps)], axis=0)
+        upper = np.min([d + gap for (_, d), gap in zip(poles, gaps)], axis=0)
+        idx = np.flatnonzero(upper >= lower.max() * (1 - 10 ** -9))
+        self.pruned += len(rows) - len(idx)
+        d = self.dists(row1, [rows[k] for k in idx], cols)
+        return rows[idx[len(d) - 1 - int(np.argmax(d[::-1]))]]
+
+    def nearest(self, row1, k = 1, rows = None, cols = None):
+        """
+        Function:
+            nearest
+        Description:
+            Finds the k closest rows to row1 by partial selection instead of sorting every row
+        Input:
+            self - current DATA instance
+            row1 - Central row to find nearest rows to
+            k - number of rows to return
+            rows - Rows to compare to distance from row1
+            cols - cols to use as the data for distance
+        Output:
+            List of the k closest (row, distance) pairs, in the same order around would give them
+        """
+        rows = list(rows) if isinstance(rows, Iterable) else self.rows
+        d = self.dists(row1, rows, cols)
+        k = min(k, len(d))
+        if k <= 0:
+            return []
+        kth = np.partition(d, k - 1)[k - 1]
+        idx = np.flatnonzero(d < kth)
+        idx = np.concatenate([idx, np.flatnonzero(d == kth)[:k - len(idx)]])
+        idx = idx[np.argsort(d[idx], kind="stable")]
+        return [(rows[i], float(d[i])) for i in idx]
 
-    def half(self, rows = None, cols = None, above = None):
+    def half(self, rows = None, cols = None, above = None, rng = None, sample = None, depth = 0):
         """
         Function:
             half
@@ -167,6 +450,9 @@ class DATA:
             rows - rows to split
             cols - cols to split
             above - previous point of split
+            rng - RNG used to pick the first pole when there is no above, the shared lib.Rng by default
+            sample - if set, B is the furthest of this many randomly sampled rows instead of all rows
+            depth - depth of this split in the tree, only used to label probes
         Output:
             left - list of rows to the left of split
             right - list of rows to the right of split
@@ -175,77 +461,209 @@ class DATA:
             mid - mid point where split occurs
             c - Distance between A and B
         """
+        return self.split(rows, cols, above, rng, sample, None, depth)[:6]
+
+    def split(self, rows = None, cols = None, above = None, rng = None, sample = None, poles = None, depth = 0):
+        """
+        Function:
+            split
+        Description:
+            half, reusing the distances from the rows to poles of the splits above. A pole that
+            is already in poles is not measured again, and the search for B is pruned with the
+            triangle inequality through the known poles. Distances skipped either way are added
+            to self.pruned. The distances to A and B are passed on for each side of the split
+        Input:
+            self - current DATA instance
+            rows - rows to split
+            cols - cols to split
+            above - previous point of split
+            rng - RNG used to pick the first pole when there is no above, the shared lib.Rng by default
+            sample - if set, B is the furthest of this many randomly sampled rows instead of all rows
+            poles - list of (pole, distances from the pole to each of rows), none by default
+            depth - depth of this split in the tree, only used to label probes
+        Output:
+            left, right, A, B, mid, c - as for half
+            lefts - poles for the left rows, the last one is A
+            rights - poles for the right rows, the last one is B
+            xy - array of the x and y of each of rows projected onto the line from A to B
+        """
         A, B, left, right, c, mid, some = None, None, None, None, None, None, None
-        def project(row):
-            x, y = util.cosine(dist(row, A), dist(row, B), c)
-            row.x = row.x or x
-            row.y = row.y or y
-            return {'row': row, 'x': x, 'y': y}
         def dist(row1, row2):
             return self.dist(row1, row2, cols)
         rows = rows or self.rows
-        A = above or util.any(rows)
-        B = self.furthest(A, rows)
-        c = dist(A, B)
-        left, right = [], []
-        mapVAR = [project(row) for row in rows]
-        sorted_rows = sorted(mapVAR, key=lambda x: x["x"])
-        for n, tmp in enumerate(sorted_rows):
-            if n <= len(rows) // 2 - 1:
-                left.append(tmp["row"])
-                mid = tmp["row"]
+        poles = poles or []
+        A = above or lib.any(rows, rng)
+        a = next((d for pole, d in poles if pole is A), None)
+        if sample and len(rows) > sample:
+            some = (rng or lib.Rng).ints(sample, len(rows) - 1)
+            if a is None:
+                B = self.furthest(A, [rows[k] for k in some], cols, [(pole, d[some]) for pole, d in poles])
             else:
-                right.append(tmp["row"])
-        return left, right, A, B, mid, c
+                B = rows[some[len(some) - 1 - int(np.argmax(a[some][::-1]))]]
+                self.pruned += len(some)
+        elif a is None:
+            B = self.furthest(A, rows, cols, poles)
+        else:
+            B = rows[len(a) - 1 - int(np.argmax(a[::-1]))]
+            self.pruned += len(rows)
+        c = dist(A, B)
+        if a is None:
+            a = self.dists(A, rows, cols)
+        else:
+            self.pruned += len(rows)
+        b = self.dists(B, rows, cols)
+        x = np.minimum(1, np.maximum(0, (a * a + c * c - b * b) / (2 * c))) if c else np.zeros(len(a))
+        xy = np.stack([x, np.sqrt(np.abs(a * a - x * x))], axis=1)
+        order = np.argsort(xy[:, 0], kind="stable")
+        lo, hi = order[:len(rows) // 2], order[len(rows) // 2:]
+        left, right = [rows[k] for k in lo], [rows[k] for k in hi]
+        mid = left[-1] if left else None
+        poles = [(pole, d) for pole, d in poles if pole is not A and pole is not B][-2:] + [(A, a), (B, b)]
+        return left, right, A, B, mid, c, [(pole, d[lo]) for pole, d in poles], [(pole, d[hi]) for pole, d in poles], xy
 
-    def cluster(self, rows = None, cols = None, above = None):
+    def cluster(self, rows = None, cols = None, above = None, workers = 1, threshold = 256, rng = None, poles = None):
         """
         Function:
             cluster
         Description:
-            Returns clustered rows by recursively splitting data
+            Returns clustered rows by recursively splitting data. Nodes share one ordering of
+            the rows and hold a slice of it, their DATA summaries are only built when asked for.
+            With workers > 1, subtrees of at least threshold rows are clustered in a process pool
+            once they are small enough to keep every worker busy, self.tasks counts how many were
+            sent. The window of sizes sent spans at least a factor of 2 so halving cannot jump
+            over it. Workers get the pole distances of the splits above, so they prune as much as
+            the serial path, and their pruned and tasks counts are added to this DATA's. Only the
+            root pivot is random, so the tree is the same as the serial one. Where each row was
+            projected at each depth is kept in the root's coords, see NODE.paste
         Input:
             self - current DATA instance
             rows - rows to cluster
             cols - cols to cluster
             above - Previous point of split
+            workers - number of worker processes
+            threshold - smallest subtree worth sending to a worker
+            rng - RNG used to pick the first pole, the shared lib.Rng by default
+            poles - list of (pole, distances from the pole to each of rows) from splits above, see split
         Output:
-            Clustered rows
+            Clustered rows, also kept as self.tree when all rows are clustered
         """
+        whole = not rows
         rows = rows if rows else self.rows
         cols = cols if cols else self.cols.x
-        node = {"data": self.clone(rows)}
+        order = np.fromiter((row.i for row in rows), dtype=np.int64, count=len(rows))
+        pool, tasks = None, []
+        most = max(2 * threshold, len(rows) // (4 * workers))
+        root = NODE(self, order, 0, len(rows))
+        root.paste(order, np.full((len(rows), 0, 2), np.nan))
+        def grow(node, rows, above, poles = None, depth = 0):
+            if pool and node is not root and threshold <= len(rows) <= most:
+                self.tasks += 1
+                tasks.append((node, depth, pool.submit(clusterTask, [row.i for row in rows], [col.at for col in cols],
+                                                       above.i, rng, [(pole.i, d) for pole, d in poles or []])))
+            elif len(rows) >= 2:
+                left, right, node.A, node.B, node.mid, node.C, lefts, rights, xy = self.split(rows, cols, above, rng, None, poles, depth)
+                root.paste(order[node.lo:node.hi], xy[:, None, :], depth)
+                middle = node.lo + len(left)
+                order[node.lo:node.hi] = [row.i for row in left + right]
+                node.left = grow(NODE(self, order, node.lo, middle), left, node.A, lefts, depth + 1)
+                node.right = grow(NODE(self, order, middle, node.hi), right, node.B, rights, depth + 1)
+            return node
+        if workers > 1 and len(rows) >= 2 * threshold:
+            with ProcessPoolExecutor(workers, initializer=share, initargs=(self,)) as pool:
+                grow(root, rows, above, poles)
+                for node, depth, task in tasks:
+                    idx, shape, coords, pruned, sent = task.result()
+                    self.pruned += pruned
+                    self.tasks += sent
+                    order[node.lo:node.hi] = idx
+                    root.paste(order[node.lo:node.hi], coords, depth)
+                    node.graft(shape)
+        else:
+            grow(root, rows, above, poles)
+        if whole:
+            self.tree = root
+        return root
 
-        if len(rows) >= 2:
-            left, right, node["A"], node["B"], node["mid"], node["C"] = self.half(rows, cols, above)
-            node["left"] = self.cluster(left, cols, node["A"])
-            node["right"] = self.cluster(right, cols, node["B"])
-        return node
+    def insert(self, t, tree = None, cols = None, stale = 0.5, rng = None):
+        """
+        Function:
+            insert
+        Description:
+            Adds a row and routes it down an existing cluster tree without reclustering. At each
+            node the row is projected onto the A-B line like half does and goes left if it lands
+            no further than mid. Nodes on the path count the row, and update their summary if it
+            has been built. The highest node whose inserted rows outnumber stale times its original
+            size is reclustered
+        Input:
+            self - current DATA instance
+            t - row to insert
+            tree - cluster tree to insert into, self.tree by default
+            cols - cols the tree was clustered on
+            stale - fraction of new rows a node takes before it is reclustered
+            rng - RNG used if the root has to be reclustered
+        Output:
+            row - the inserted row, ValueError is raised before adding it if there is no tree
+        """
+        root, above, cols = tree or self.tree, None, cols or self.cols.x
+        if root is None:
+            raise ValueError("no cluster tree to insert into, call cluster first or pass tree")
+        self.add(t)
+        node, row, worst, depth = root, self.rows[-1], None, 0
+        while node is not None:
+            node.extra.append(row.i)
+            node.inserted += 1
+            if node.cache is not None:
+                node.cache.add(row)
+            if worst is None and node.inserted > stale * (node.hi - node.lo):
+                worst = (node, above, depth)
+            if "left" not in node:
+                break
+            a, b = self.measure(row, [node.A, node.B], cols).tolist()
+            a2, b2 = self.measure(node.mid, [node.A, node.B], cols).tolist()
+            left = node.right is None or node.C == 0 or lib.cosine(a, b, node.C)[0] <= lib.cosine(a2, b2, node.C)[0]
+            node, above, depth = (node.left, node.A, depth + 1) if left else (node.right, node.B, depth + 1)
+        if worst:
+            node, above, depth = worst
+            vars(node).update(vars(self.cluster(node.rows, cols, above, rng=rng)))
+            if node is not root:
+                root.paste(node.order, node.coords[node.order], depth, clear=True)
+                node.coords = None
+        return row
 
-    def sway(self, rows = None, min = None, cols = None, above = None):
+    def sway(self, rows = None, min = None, cols = None, above = None, rng = None, sample = None, evals = None):
         """
         Function:
             sway
         Description:
-            Finds the best half of the data by recursion
+            Finds the best half of the data by recursion. For large tables, sample bounds how many
+            rows are scanned to pick each pole B and evals bounds how many times better is called
         Input:
             self - current DATA instance
             rows - rows to sway
             cols - cols to sway
             min - Determines when recursion stops
             above - Previous point of split
+            rng - RNG used to pick poles, the shared lib.Rng by default
+            sample - number of randomly sampled rows to pick each pole B from, all rows by default
+            evals - stop once better has been called this many times, no limit by default
         Output:
-            Swayed rows
+            Swayed rows, the root node's evals is the number of times better was called and its
+            coords hold where each row was projected at each depth
         """
         rows = rows if rows else self.rows
-        min = min if min else len(rows) ** util.args.min
+        min = min if min else len(rows) ** self.config.min
         cols = cols if cols else self.cols.x
-        node = {"data": self.clone(rows)}
-
-        if len(rows) > 2 * min:
-           left, right, node["A"], node["B"], node["mid"], _ = self.half(rows, cols, above)
-           if self.better(node["B"], node["A"]):
-               left, right, node["A"], node["B"] = right, left, node["B"], node["A"]
-           node["left"] = self.sway(left,  min, cols, node["A"])
-
-        return node
+        order = np.fromiter((row.i for row in rows), dtype=np.int64, count=len(rows))
+        root = NODE(self, order, 0, len(rows))
+        root.paste(order, np.full((len(rows), 0, 2), np.nan))
+        def grow(node, rows, above, poles = None, depth = 0):
+            if len(rows) > 2 * min and (evals is None or root.evals < evals):
+                left, right, node.A, node.B, node.mid, node.C, lefts, rights, xy = self.split(rows, cols, above, rng, sample, poles, depth)
+                root.paste(order[node.lo:node.hi], xy[:, None, :], depth)
+                root.evals += 1
+                if self.better(node.B, node.A):
+                    left, right, node.A, node.B, lefts, rights = right, left, node.B, node.A, rights, lefts
+                order[node.lo:node.hi] = [row.i for row in left + right]
+                node.left = grow(NODE(self, order, node.lo, node.lo + len(left)), left, node.A, lefts, depth + 1)
+            return node
+        return grow(root, rows, above)
@@ -0,0 +1,112 @@
+import heapq
+import numpy as np
+import lib
+
+class INDEX:
+    def __init__(self, data, cols = None, leaf = 16, rng = None):
+        self.data = data
+        self.cols = cols or data.cols.x
+        self.leaf = leaf
+        self.rng = rng
+        self.root = None
+        self.evals = 0
+
+    def build(self, rows = None):
+        """
+        Function:
+            build
+        Description:
+            Builds a vantage point tree over rows. Each node picks a random vantage row, measures
+            every other row to it in one pass of the distance kernel and sends the closer half
+            inside and the rest outside, keeping the range of distances on each side for pruning
+        Input:
+            self - current INDEX instance
+            rows - rows to index, all rows of the DATA by default
+        Output:
+            self
+        """
+        rng = self.rng or lib.Rng
+        def grow(rows):
+            if len(rows) <= self.leaf:
+                return rows
+            vp = rng.any(rows)
+            rows = [row for row in rows if row is not vp]
+            d = self.data.measure(vp, rows, self.cols)
+            order = np.argsort(d, kind="stable")
+            half = len(rows) // 2
+            inner, outer = order[:half], order[half:]
+            return (vp, float(d[inner[0]]), float(d[inner[-1]]), float(d[outer[0]]), float(d[outer[-1]]),
+                    grow([rows[k] for k in inner]), grow([rows[k] for k in outer]))
+        self.root = grow(list(self.data.rows if rows is None else rows))
+        return self
+
+    def query(self, row, k = 1, eps = 0, checks = None):
+        """
+        Function:
+            query
+        Description:
+            Finds the k rows closest to row, visiting the nodes whose distance bound is lowest
+            first and skipping the ones the triangle inequality rules out. With eps = 0 and no
+            checks the answer is exact, up to missing values, which make the distance a little
+            less than a metric
+        Input:
+            self - current INDEX instance
+            row - ROW to search around, or a list of cells
+            k - number of rows to return
+            eps - nodes that cannot hold a row closer than (1 + eps) times the k-th best so far are skipped
+            checks - if set, stop after this many distance evaluations
+        Output:
+            List of the k closest (row, distance) pairs, closest first
+        """
+        if k <= 0:
+            return []
+        if not hasattr(row, "store"):
+            row = type(self.data)([self.data.cols.names, row], None, self.data.config).rows[0]
+        best, todo, evals, n = [], [(0.0, 0, self.root)], 0, 0
+        def kth():
+            return -best[0][0] if len(best) == k else np.inf
+        def keep(r, d):
+            item = (-d, -r.i, r)
+            if len(best) < k:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+        while todo and (checks is None or evals < checks):
+            bound, _, node = heapq.heappop(todo)
+            if bound * (1 + eps) > kth():
+                break
+            if isinstance(node, list):
+                if node:
+                    node = node if checks is None else node[:checks - evals]
+                    for r, d in zip(node, self.data.measure(row, node, self.cols).tolist()):
+                        keep(r, d)
+                    evals += len(node)
+                continue
+            vp, lo1, hi1, lo2, hi2, inner, outer = node
+            d = float(self.data.measure(row, [vp], self.cols)[0])
+            evals += 1
+            keep(vp, d)
+            for lo, hi, child in [(lo1, hi1, inner), (lo2, hi2, outer)]:
+                bound2 = max(bound, d - hi, lo - d, 0)
+                if bound2 * (1 + eps) <= kth():
+                    n += 1
+                    heapq.heappush(todo, (bound2, n, child))
+        self.evals += evals
+        return [(r, -d) for d, _, r in sorted(best, reverse=True)]
+
+    def queries(self, rows, k = 1, eps = 0, checks = None):
+        """
+        Function:
+            queries
+        Description:
+            Runs query for a batch of rows
+        Input:
+            self - current INDEX instance
+            rows - ROWs or lists of cells to search around
+            k - number of rows to return for each
+            eps - recall vs speed slack, see query
+            checks - distance evaluations allowed per query, see query
+        Output:
+            List with the k closest (row, distance) pairs of each row
+        """
+        return [self.query(row, k, eps, checks) for row in rows]
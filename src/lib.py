@@ -0,0 +1,125 @@
+import csv
+import numpy as np
+from rng import RNG
+
+Rng = RNG(937162211)
+
+def rint(lo = None, hi = None, rng = None):
+    """
+    Function:
+        rint
+    Description:
+        Makes a random number
+    Input:
+        low - low value
+        high - high value
+        rng - RNG to draw from, the shared Rng by default
+    Output:
+        Random number
+    """
+    return (rng or Rng).rint(lo, hi)
+
+def kap(listOfCols, fun):
+    """
+    Function:
+        kap
+    Description:
+        Creates map that stores functions as value
+    Input:
+        listOfCols - list of columns
+        fun - anonymous function to be used as value in map
+    Output:
+        u - map of anonymous functions
+    """
+    u = {}
+    for k, v in enumerate(listOfCols):
+        v, k = fun(v)
+        u[k or len(u)+1] = v
+    return u
+
+def rand(low, high, rng = None):
+    """
+    Function:
+        rand
+    Description:
+        Creates a random number
+    Input:
+        low - low value
+        high - high value
+        rng - RNG to draw from, the shared Rng by default
+    Output:
+        Random number
+    """
+    return (rng or Rng).rand(low, high)
+
+def power(t, p):
+    """
+    Function:
+        power
+    Description:
+        Raises every value in an array to the power p, with plain array ops for the common
+        p = 2 and p = 1 (and their roots) and np.power otherwise. Results can differ from the
+        scalar ** in the last bit, so compare them with a tolerance
+    Input:
+        t - Array of values
+        p - exponent
+    Output:
+        Array of t ** p
+    """
+    if p == 2:
+        return t * t
+    if p == 1:
+        return np.abs(t)
+    if p == 0.5:
+        return np.sqrt(t)
+    return np.power(t, p)
+
+def cosine(a, b, c):
+    """
+    Function:
+        cosine
+    Description:
+        Finds x, y of line between a & b
+    Input:
+        a - First point
+        b - Second point
+        c - distance between a & b
+    Output:
+        x2 - x of line between a & b
+        y - y of line between a & b
+    """
+    x1 = (a ** 2 + c ** 2 - b ** 2) / (2 * c) if c else 0
+    x2 = max(0, min(1, x1))
+    y = (abs(a ** 2 - x2 ** 2)) ** 0.5
+    return x2, y
+
+def any(t, rng = None):
+    """
+    Function:
+        any
+    Description:
+        Selects a random row
+    Input:
+        t - DATA object
+        rng - RNG to draw from, the shared Rng by default
+    Output:
+        Random row from t
+    """
+    return (rng or Rng).any(t)
+
+def readCSV(sFilename, fun):
+    """
+    Function:
+        readCSV
+    Description:
+        reads a CSV and runs a callback function on every line
+    Input:
+        sFilename - path of CSV file to be read
+        fun - callback function to be called for each line in the CSV
+    Output:
+        None
+    """
+    with open(sFilename, mode='r') as file:
+        csvFile = csv.reader(file)
+        for line in csvFile:
+            fun(line)
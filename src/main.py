@@ -1,4 +1,4 @@
-from testfile import getCliArgs, printCLIvalues
+from testfile import getCliArgs, printCLIvalues, examples, example, usage
 import utility
 
 def main(funs):
@@ -8,7 +8,7 @@ def main(funs):
     Description:
         Main function that tests to see if examples pass. If help command is used, the help string is printed and tests are not run
     Input:
-        funs - Dictionary of callback functions
+        funs - Dictionary of examples, their callbacks are looked up by example when they are run
     Output:
         0 - Tests passed
         1 - 1 or more tests failed
@@ -16,11 +16,11 @@ def main(funs):
     fails = 0
     getCliArgs()
     if (utility.args.help):
-        print(utility.help)
+        print(usage())
     else:
         for what, _ in funs.items():
             if utility.args.go == "all" or what == utility.args.go:
-                if funs[what]() == False:
+                if example(what)() == False:
                     fails += 1
                     print("❌ fail:",what)
                 else: print("✅ pass:",what)
@@ -29,4 +29,4 @@ def main(funs):
     else: return 1
 
 if __name__ == "__main__":
-    main(utility.egs)
+    main(examples)
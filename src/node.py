@@ -0,0 +1,220 @@
+import math
+import numpy as np
+
+class NODE:
+    fields = ["data", "A", "B", "mid", "C", "left", "right"]
+
+    def __init__(self, source, order, lo, hi):
+        self.source = source
+        self.order = order
+        self.lo = lo
+        self.hi = hi
+        self.A = None
+        self.B = None
+        self.mid = None
+        self.C = None
+        self.left = None
+        self.right = None
+        self.cache = None
+        self.extra = []
+        self.inserted = 0
+        self.stats = None
+        self.evals = 0
+        self.grid = None
+        self.used = (0, 0)
+
+    @property
+    def rows(self):
+        """
+        Function:
+            rows
+        Description:
+            Looks up the rows of this node from its slice of the shared row order, followed by any rows inserted since
+        Input:
+            self - current NODE instance
+        Output:
+            List of the node's rows
+        """
+        rows = self.source.store.rows
+        return [rows[i] for i in self.order[self.lo:self.hi]] + [rows[i] for i in self.extra]
+
+    @property
+    def data(self):
+        """
+        Function:
+            data
+        Description:
+            Summarises the node's rows into a DATA the first time it is asked for, by merging
+            the children's summaries when there are two children and by clone otherwise
+        Input:
+            self - current NODE instance
+        Output:
+            DATA holding only this node's rows
+        """
+        if self.cache is None:
+            if self.left is not None and self.right is not None:
+                self.cache = self.left.data.merge(self.right.data)
+            else:
+                self.cache = self.source.clone(self.rows)
+        return self.cache
+
+    @property
+    def coords(self):
+        """
+        Function:
+            coords
+        Description:
+            Shows the part of grid that holds coordinates, see paste
+        Input:
+            self - current NODE instance
+        Output:
+            Float32 array of (STORE row x depth x 2) coordinates, None if nothing was pasted
+        """
+        return None if self.grid is None else self.grid[:self.used[0], :self.used[1]]
+
+    @coords.setter
+    def coords(self, coords):
+        """
+        Function:
+            coords
+        Description:
+            Replaces the coordinates, say with ones read back by tree.load
+        Input:
+            self - current NODE instance
+            coords - array of (STORE row x depth x 2) coordinates, or None
+        Output:
+            None
+        """
+        self.grid = None if coords is None else np.asarray(coords, dtype=np.float32).copy()
+        self.used = (0, 0) if coords is None else self.grid.shape[:2]
+
+    def dump(self):
+        """
+        Function:
+            dump
+        Description:
+            Describes the shape of the subtree under this node with row indices, so it can be sent between processes
+        Input:
+            self - current NODE instance
+        Output:
+            None for a leaf, else (A, B, mid, C, size of left, left shape, right shape)
+        """
+        if self.left is None:
+            return None
+        return (self.A.i, self.B.i, self.mid.i, self.C, self.left.hi - self.left.lo,
+                self.left.dump(), self.right.dump() if self.right is not None else None)
+
+    def graft(self, shape):
+        """
+        Function:
+            graft
+        Description:
+            Rebuilds the subtree described by dump under this node
+        Input:
+            self - current NODE instance
+            shape - subtree shape from dump
+        Output:
+            self
+        """
+        if shape is not None:
+            rows = self.source.store.rows
+            a, b, mid, self.C, n, left, right = shape
+            self.A, self.B, self.mid = rows[a], rows[b], rows[mid]
+            self.left = NODE(self.source, self.order, self.lo, self.lo + n).graft(left)
+            if right is not None:
+                self.right = NODE(self.source, self.order, self.lo + n, self.hi).graft(right)
+        return self
+
+    def paste(self, idx, coords, depth = 0, clear = False):
+        """
+        Function:
+            paste
+        Description:
+            Writes projection coordinates into this node's coords, a (STORE row x depth x 2) float32
+            array of the x and y each row got in the node it was in at each depth below here, NaN where
+            the row was not split. coords lives in grid, which starts with room for ceil(log2 n) + 1
+            depths of the n rows first pasted and at least doubles when more rows or depths are needed,
+            so pasting a tree level by level does not copy the array each level. With clear, the rows'
+            old coordinates below the new ones are wiped, for subtrees that were clustered again
+        Input:
+            self - current NODE instance
+            idx - STORE indices of the rows
+            coords - array of (len(idx) x levels x 2) coordinates, level 0 being depth
+            depth - depth below this node of the first level of coords
+            clear - True to wipe the rows' coordinates deeper than the new ones
+        Output:
+            None
+        """
+        n = max(self.used[0], self.source.store.n, int(idx.max()) + 1 if len(idx) else 0)
+        d = max(self.used[1], depth + coords.shape[1])
+        if self.grid is None:
+            self.grid = np.full((n, max(d, math.ceil(math.log2(max(len(idx), 1))) + 1), 2), np.nan, dtype=np.float32)
+        elif n > self.grid.shape[0] or d > self.grid.shape[1]:
+            old = self.grid
+            self.grid = np.full((max(n, 2 * old.shape[0]) if n > old.shape[0] else old.shape[0],
+                                 max(d, 2 * old.shape[1]) if d > old.shape[1] else old.shape[1], 2), np.nan, dtype=np.float32)
+            self.grid[:old.shape[0], :old.shape[1]] = old
+        if clear:
+            self.grid[idx, depth + coords.shape[1]:self.used[1]] = np.nan
+        self.grid[idx, depth:depth + coords.shape[1]] = coords
+        self.used = (n, d)
+
+    def xy(self, depth = 0):
+        """
+        Function:
+            xy
+        Description:
+            Looks up where each row was projected at a depth below this node, or at the deepest
+            level above it for rows that reached a leaf first
+        Input:
+            self - current NODE instance
+            depth - depth below this node, 0 for the split of this node
+        Output:
+            Array of (STORE row x 2) coordinates, NaN for rows never projected
+        """
+        coords = np.full((max(len(self.coords), self.source.store.n), depth + 1, 2), np.nan)
+        coords[:len(self.coords), :self.coords.shape[1]] = self.coords[:, :depth + 1]
+        seen = ~np.isnan(coords[:, :, 0])
+        deepest = coords.shape[1] - 1 - np.argmax(seen[:, ::-1], axis=1)
+        return np.where(seen.any(axis=1)[:, None], coords[np.arange(len(coords)), deepest], np.nan)
+
+    def keys(self):
+        """
+        Function:
+            keys
+        Description:
+            Lists the fields that are set on this node, like the keys of the old node dicts
+        Input:
+            self - current NODE instance
+        Output:
+            List of field names
+        """
+        return [k for k in self.fields if k == "data" or getattr(self, k) is not None]
+
+    def get(self, k, default = None):
+        """
+        Function:
+            get
+        Description:
+            dict style lookup of a field
+        Input:
+            self - current NODE instance
+            k - field name
+            default - value to return if the field is not set
+        Output:
+            Value of the field or default
+        """
+        return getattr(self, k) if k in self else default
+
+    def __contains__(self, k):
+        return k in self.keys()
+
+    def __getitem__(self, k):
+        if k not in self:
+            raise KeyError(k)
+        return getattr(self, k)
+
+    def __setitem__(self, k, v):
+        if k not in self.fields:
+            raise KeyError(k)
+        setattr(self, k, v)
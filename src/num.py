@@ -1,4 +1,8 @@
+import numpy as np
+
 class NUM:
+    __slots__ = ("at", "txt", "n", "mu", "m2", "lo", "hi", "w")
+
     def __init__(self, at = 0, txt = ""):
         self.at = at
         self.txt = txt
@@ -30,6 +34,75 @@ class NUM:
             self.lo = min(n, self.lo)
             self.hi = max(n, self.hi)
 
+    def addMany(self, ns):
+        """
+        Function:
+            addMany
+        Description:
+            Adds a whole array of values at once by summarising them and merging the summary in
+        Input:
+            self - current NUM instance
+            ns - values to add, "?" or NaN values are skipped
+        Output:
+            None
+        """
+        ns = np.asarray(ns)
+        if ns.dtype.kind not in "fiub":
+            ns = np.array([float(n) for n in ns if n != "?"])
+        ns = ns.astype(float)
+        ns = ns[~np.isnan(ns)]
+        if len(ns):
+            other = NUM(self.at, self.txt)
+            other.n, other.mu = len(ns), float(ns.mean())
+            other.m2 = float(((ns - other.mu) ** 2).sum())
+            other.lo, other.hi = float(ns.min()), float(ns.max())
+            self.merge(other)
+
+    def merge(self, other):
+        """
+        Function:
+            merge
+        Description:
+            Folds another NUM's summary into this one with Chan's parallel variance formula
+        Input:
+            self - current NUM instance
+            other - NUM summarising other values of the same column
+        Output:
+            self
+        """
+        n = self.n + other.n
+        if other.n:
+            d = other.mu - self.mu
+            self.mu += d * other.n / n
+            self.m2 += other.m2 + d * d * self.n * other.n / n
+            self.n = n
+            self.lo = min(self.lo, other.lo)
+            self.hi = max(self.hi, other.hi)
+        return self
+
+    def sub(self, other):
+        """
+        Function:
+            sub
+        Description:
+            Takes another NUM's values back out of this summary, the reverse of merge.
+            lo and hi can not be recovered so they are left as bounds
+        Input:
+            self - current NUM instance
+            other - NUM summarising values that were merged or added into this one
+        Output:
+            self
+        """
+        n = self.n - other.n
+        if n <= 0:
+            self.n, self.mu, self.m2 = 0, 0, 0
+        elif other.n:
+            mu = (self.n * self.mu - other.n * other.mu) / n
+            d = other.mu - mu
+            self.m2 = max(0, self.m2 - other.m2 - d * d * n * other.n / self.n)
+            self.n, self.mu = n, mu
+        return self
+
     def mid(self):
         """
         Function:
@@ -54,7 +127,7 @@ class NUM:
         Output:
             True or False
         """
-        return (self.m2 < 0 or self.n < 2) and 0 or (self.m2 / (self.n - 1)) ** 0.5
+        return 0 if (self.m2 < 0 or self.n < 2) else (self.m2 / (self.n - 1)) ** 0.5
 
     def norm(self, n):
         """
@@ -91,3 +164,31 @@ class NUM:
         if n2 == "?":
             n2 = 1 if n1 < 0.5 else 0
         return abs(n1 - n2)
+
+    def dists(self, n1, ns):
+        """
+        Function:
+            dists
+        Description:
+            Vectorized dist from one value to an array of values, following the same "?" rules as dist.
+            n1 can also be an array, which is broadcast against ns, say a column against a row for every pair
+        Input:
+            self - current NUM instance
+            n1 - First value as a float, NaN if it is missing
+            ns - Array of values, NaN where they are missing
+        Output:
+            Array of normalized + differences between n1 and each of ns
+        """
+        gap = self.hi - self.lo + 1 + 10 ** (-32)
+        ns = (ns - self.lo) / gap
+        known = ~np.isnan(ns)
+        if np.ndim(n1):
+            n1 = (n1 - self.lo) / gap
+            gone = np.isnan(n1)
+            x1 = np.where(gone, np.where(ns < 0.5, 1.0, 0.0), n1)
+            xs = np.where(known, ns, np.where(x1 < 0.5, 1.0, 0.0))
+            return np.where(gone & ~known, 1.0, np.abs(x1 - xs))
+        if n1 != n1:
+            return np.where(known, np.abs(np.where(ns < 0.5, 1.0, 0.0) - ns), 1.0)
+        n1 = (n1 - self.lo) / gap
+        return np.where(known, np.abs(n1 - ns), abs(n1 - (1 if n1 < 0.5 else 0)))
@@ -0,0 +1,174 @@
+import sys
+import numpy as np
+
+def label(k):
+    """
+    Function:
+        label
+    Description:
+        Names the k-th row like spreadsheet columns, A to Z then AA, AB and so on
+    Input:
+        k - row number, from 0
+    Output:
+        Label string
+    """
+    s = ""
+    k += 1
+    while k:
+        k, r = divmod(k - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+def bins(xy, n = 20):
+    """
+    Function:
+        bins
+    Description:
+        Bins x and y in [0, 1] into an (n + 1) x (n + 1) grid with array ops, so 1 gets a cell of its own
+        like int(x * n) does. Rows with a NaN coordinate are left out
+    Input:
+        xy - array of (row x 2) coordinates
+        n - resolution of the grid
+    Output:
+        counts - (n + 1) x (n + 1) array of how many rows fell in each cell, indexed [y, x]
+        first - same shape array of the first row in each cell, -1 for empty cells
+    """
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+    rows = np.flatnonzero(~np.isnan(xy).any(axis=1))
+    cells = np.clip((xy[rows] * n).astype(np.int64), 0, n)
+    flat = cells[:, 1] * (n + 1) + cells[:, 0]
+    counts = np.bincount(flat, minlength=(n + 1) ** 2)
+    first = np.full((n + 1) ** 2, -1, dtype=np.int64)
+    used, at = np.unique(flat, return_index=True)
+    first[used] = rows[at]
+    return counts.reshape(n + 1, n + 1), first.reshape(n + 1, n + 1)
+
+def asText(counts, first, labels, legend = True):
+    """
+    Function:
+        asText
+    Description:
+        Draws the grid as text, a cell with one row shows its label and a cell with more shows how many,
+        or * when the count does not fit. Cells are as wide as the longest label, and lines stop after
+        the last one with a row in it
+    Input:
+        counts - cell counts from bins
+        first - first row of each cell from bins
+        labels - name of each row
+        legend - list every row's label and name first
+    Output:
+        Text of the grid
+    """
+    tags = [label(k) for k in range(len(labels))]
+    w = max([len(tag) for tag in tags] + [1])
+    lines = [""] + [tag + " " + str(name) for tag, name in zip(tags, labels)] + [""] if legend else []
+    last = int(np.flatnonzero(counts.any(axis=1))[-1]) + 1 if counts.any() else 0
+    for count, row in zip(counts[:last], first[:last]):
+        cells = []
+        for c, k in zip(count.tolist(), row.tolist()):
+            s = " " if c == 0 else tags[k] if c == 1 else str(c) if len(str(c)) <= w else "*" * w
+            cells.append(s.ljust(w))
+        lines.append("{" + "".join(cells) + "}")
+    return "\n".join(lines) + "\n"
+
+def asCSV(counts, first, labels):
+    """
+    Function:
+        asCSV
+    Description:
+        Lists the occupied cells as CSV
+    Input:
+        counts - cell counts from bins
+        first - first row of each cell from bins
+        labels - name of each row
+    Output:
+        CSV text with x, y, count and the label of the first row of each occupied cell
+    """
+    ys, xs = np.nonzero(counts)
+    lines = ["x,y,count,label"]
+    for x, y in zip(xs.tolist(), ys.tolist()):
+        lines.append(f"{x},{y},{counts[y, x]},\"{str(labels[first[y, x]]).replace(chr(34), chr(34) * 2)}\"")
+    return "\n".join(lines) + "\n"
+
+def asPPM(counts, scale = 8):
+    """
+    Function:
+        asPPM
+    Description:
+        Draws the grid as a binary PPM image, occupied cells get darker with the log of their count
+    Input:
+        counts - cell counts from bins
+        scale - pixels per cell side
+    Output:
+        Bytes of the image
+    """
+    shade = np.log1p(counts) / max(np.log1p(counts.max()), 1)
+    grey = (255 * (1 - shade)).astype(np.uint8)
+    grey = np.where(counts > 0, np.minimum(grey, 200), 255).astype(np.uint8)
+    pixels = np.repeat(np.repeat(grey, scale, axis=0), scale, axis=1)
+    image = np.stack([pixels, pixels, np.full_like(pixels, 255)], axis=-1)
+    return f"P6 {image.shape[1]} {image.shape[0]} 255\n".encode() + image.tobytes()
+
+def asSVG(counts, first, labels, scale = 16):
+    """
+    Function:
+        asSVG
+    Description:
+        Draws the grid as SVG, one square per occupied cell shaded by its count, titled with its first label and count
+    Input:
+        counts - cell counts from bins
+        first - first row of each cell from bins
+        labels - name of each row
+        scale - pixels per cell side
+    Output:
+        Text of the image
+    """
+    ys, xs = np.nonzero(counts)
+    most = max(np.log1p(counts.max()), 1)
+    h, w = counts.shape
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{w * scale}" height="{h * scale}">',
+           f'<rect width="{w * scale}" height="{h * scale}" fill="white"/>']
+    for x, y in zip(xs.tolist(), ys.tolist()):
+        name = str(labels[first[y, x]]).replace("&", "&amp;").replace("<", "&lt;")
+        out.append(f'<rect x="{x * scale}" y="{y * scale}" width="{scale}" height="{scale}" fill="navy" '
+                   f'fill-opacity="{0.3 + 0.7 * np.log1p(counts[y, x]) / most:.3f}"><title>{name} ({counts[y, x]})</title></rect>')
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
+
+def render(xy, labels, what = "text", n = 20, sFile = None, legend = True):
+    """
+    Function:
+        render
+    Description:
+        Bins projected rows into a grid and writes it in one buffered write
+    Input:
+        xy - array of (row x 2) coordinates in [0, 1]
+        labels - name of each row
+        what - "text", "csv", "ppm" or "svg"
+        n - resolution of the grid
+        sFile - path to write to, stdout by default
+        legend - for text, list every row's label and name first
+    Output:
+        counts - cell counts from bins
+    """
+    counts, first = bins(xy, n)
+    if what == "text":
+        out = asText(counts, first, labels, legend)
+    elif what == "csv":
+        out = asCSV(counts, first, labels)
+    elif what == "ppm":
+        out = asPPM(counts)
+    elif what == "svg":
+        out = asSVG(counts, first, labels)
+    else:
+        raise ValueError(f"cannot render {what}, try text, csv, ppm or svg")
+    if sFile:
+        with open(sFile, "wb") as f:
+            f.write(out if isinstance(out, bytes) else out.encode())
+    elif isinstance(out, bytes):
+        sys.stdout.flush()
+        sys.stdout.buffer.write(out)
+        sys.stdout.buffer.flush()
+    else:
+        sys.stdout.write(out)
+    return counts
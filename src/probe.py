@@ -0,0 +1,162 @@
+import atexit
+import cProfile
+import functools
+import time
+from data import DATA
+from num import NUM
+from sym import SYM
+
+counts = {}
+seconds = {}
+saved = []
+profiler = None
+
+def depth(data, rows = None, cols = None, above = None, rng = None, sample = None, poles = None, depth = 0):
+    """
+    Function:
+        depth
+    Description:
+        Names a half (or split, which does the work of half) call by the depth in the tree that
+        cluster and sway pass to split
+    Input:
+        data - DATA being split
+        rows, cols, above, rng, sample, poles - the rest of split's arguments
+        depth - depth of the split
+    Output:
+        Counter name for this half call
+    """
+    return "DATA.half depth " + str(depth)
+
+hooks = [(DATA, "dist", None, None),
+         (DATA, "measure", None, lambda data, row1, rows, *_, **__: len(rows)),
+         (DATA, "around", None, None),
+         (DATA, "split", depth, None),
+         (DATA, "furthest", None, None),
+         (DATA, "clone", None, lambda data, rows = None, *_, **__: len(rows or [])),
+         (DATA, "better", None, None),
+         (DATA, "betters", None, lambda data, rows = None, others = None, *_, **__:
+             len(data.rows if rows is None else rows) * len((data.rows if rows is None else rows) if others is None else others)),
+         (DATA, "cluster", None, None),
+         (DATA, "sway", None, None),
+         (DATA, "insert", None, None),
+         (NUM, "dist", None, None),
+         (NUM, "dists", None, lambda col, n1, ns: len(ns)),
+         (SYM, "dist", None, None),
+         (SYM, "dists", None, lambda col, s1, ss: len(ss))]
+
+def wrap(cls, name, label, size):
+    """
+    Function:
+        wrap
+    Description:
+        Replaces a method with one that counts and times its calls
+    Input:
+        cls - class owning the method
+        name - method name
+        label - function of the call arguments giving the counter name, cls.name by default
+        size - function of the call arguments giving the number of items the call handles, 1 by default
+    Output:
+        None
+    """
+    fun = getattr(cls, name)
+    saved.append((cls, name, fun))
+    key = cls.__name__ + "." + name
+    @functools.wraps(fun)
+    def probed(*args, **kwargs):
+        k = label(*args, **kwargs) if label else key
+        start = time.perf_counter()
+        try:
+            return fun(*args, **kwargs)
+        finally:
+            seconds[k] = seconds.get(k, 0) + time.perf_counter() - start
+            counts[k] = counts.get(k, 0) + (size(*args, **kwargs) if size else 1)
+    setattr(cls, name, probed)
+
+def enable(sProfile = None, report = True):
+    """
+    Function:
+        enable
+    Description:
+        Turns instrumentation on by wrapping the hot methods. Nothing is wrapped until this is called,
+        so a run without it costs nothing
+    Input:
+        sProfile - if set, path to write a cProfile dump to at exit, readable by pstats, snakeviz or flameprof
+        report - print the summary at exit
+    Output:
+        None
+    """
+    global profiler
+    if saved:
+        return
+    for cls, name, label, size in hooks:
+        wrap(cls, name, label, size)
+    if sProfile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        atexit.register(dump, sProfile)
+    if report:
+        atexit.register(lambda: print(summary()))
+
+def disable():
+    """
+    Function:
+        disable
+    Description:
+        Puts the original methods back and stops the profiler. Counters are kept until reset
+    Input:
+        None
+    Output:
+        None
+    """
+    global profiler
+    while saved:
+        cls, name, fun = saved.pop()
+        setattr(cls, name, fun)
+    if profiler:
+        profiler.disable()
+
+def reset():
+    """
+    Function:
+        reset
+    Description:
+        Clears the counters and timers
+    Input:
+        None
+    Output:
+        None
+    """
+    counts.clear()
+    seconds.clear()
+
+def dump(sProfile):
+    """
+    Function:
+        dump
+    Description:
+        Writes the cProfile stats collected so far
+    Input:
+        sProfile - path of the stats file
+    Output:
+        None
+    """
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(sProfile)
+
+def summary():
+    """
+    Function:
+        summary
+    Description:
+        Formats the counters and timers, slowest first. Times include nested calls
+        and the counts of measure, clone, betters and dists are rows or pairs handled, not calls
+    Input:
+        None
+    Output:
+        Summary as a string
+    """
+    lines = [f"{'probe':28} {'count':>10} {'seconds':>10}"]
+    for k in sorted(seconds, key=lambda k: -seconds[k]):
+        lines.append(f"{k:28} {counts[k]:10} {seconds[k]:10.4f}")
+    return "\n".join(lines)
@@ -0,0 +1,98 @@
+import math
+import numpy as np
+
+class RNG:
+    m = 2147483647
+    a = 16807
+
+    def __init__(self, seed = 937162211):
+        self.seed = seed
+
+    def rand(self, low = None, high = None):
+        """
+        Function:
+            rand
+        Description:
+            Creates a random number with the Park-Miller generator
+        Input:
+            self - current RNG instance
+            low - low value
+            high - high value
+        Output:
+            Random number
+        """
+        low, high = low or 0, high or 1
+        self.seed = (self.a * self.seed) % self.m
+        return low + (high - low) * self.seed / self.m
+
+    def rint(self, lo = None, hi = None):
+        """
+        Function:
+            rint
+        Description:
+            Makes a random integer
+        Input:
+            self - current RNG instance
+            lo - low value
+            hi - high value
+        Output:
+            Random integer
+        """
+        return math.floor(0.5 + self.rand(lo, hi))
+
+    def any(self, t):
+        """
+        Function:
+            any
+        Description:
+            Selects a random item
+        Input:
+            self - current RNG instance
+            t - list to pick from
+        Output:
+            Random item from t
+        """
+        return t[self.rint(None, len(t) - 1)]
+
+    def ints(self, n, hi):
+        """
+        Function:
+            ints
+        Description:
+            Makes n random integers at once, the same ones n calls of rint(None, hi) would make
+        Input:
+            self - current RNG instance
+            n - how many integers to make
+            hi - largest integer
+        Output:
+            Array of n random integers
+        """
+        seeds = np.empty(n, dtype=np.int64)
+        seed = self.seed
+        for k in range(n):
+            seed = (self.a * seed) % self.m
+            seeds[k] = seed
+        if n:
+            self.seed = seed
+        hi = hi or 1
+        if hi * self.m < 2 ** 53:
+            return np.floor(0.5 + (hi * seeds) / self.m).astype(np.int64)
+        return np.array([math.floor(0.5 + hi * int(s) / self.m) for s in seeds], dtype=np.int64)
+
+    def split(self, k = 2):
+        """
+        Function:
+            split
+        Description:
+            Splits off k independent child generators. One draw of this generator picks a start and
+            the children jump ahead of it by multiples of (m - 1) / (k + 1) steps, with a ** steps mod m,
+            so neither the children nor this generator run into each other's stream for that many draws
+        Input:
+            self - current RNG instance
+            k - number of child generators
+        Output:
+            List of k RNGs
+        """
+        self.rand()
+        stride = (self.m - 1) // (k + 1)
+        return [RNG(self.seed * pow(self.a, j * stride, self.m) % self.m) for j in range(1, k + 1)]
@@ -1,5 +1,34 @@
 class ROW:
-    def __init__(self, t):
-        self.cells = t
-        self.x = None
-        self.y = None
+    __slots__ = ("store", "i")
+
+    def __init__(self, store, i):
+        self.store = store
+        self.i = i
+
+    @property
+    def cells(self):
+        """
+        Function:
+            cells
+        Description:
+            Decodes the row out of its STORE
+        Input:
+            self - current ROW instance
+        Output:
+            List of cells in the row
+        """
+        return self.store.cells(self.i)
+
+    def cell(self, at):
+        """
+        Function:
+            cell
+        Description:
+            Reads one cell of the row straight from its STORE
+        Input:
+            self - current ROW instance
+            at - column index
+        Output:
+            Value of the cell
+        """
+        return self.store.cell(self.i, at)
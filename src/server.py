@@ -0,0 +1,380 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+import batch
+import utility as util
+from config import the
+from data import DATA
+from rng import RNG
+
+class SERVER:
+    def __init__(self, config = None, size = 8):
+        self.config = config or the
+        self.size = size
+        self.entries = OrderedDict()
+        self.guard = threading.Lock()
+        self.locks = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.latency = {}
+        self.routes = {"cluster": self.cluster, "sway": self.sway, "nearest": self.nearest,
+                       "place": self.place, "metrics": self.metrics}
+
+    def key(self, kind, sFile, *params):
+        """
+        Function:
+            key
+        Description:
+            Makes the cache key of a file, so an edited file misses the cache
+        Input:
+            self - current SERVER instance
+            kind - what is cached for the file
+            sFile - path of the file
+            params - request parameters the cached value depends on
+        Output:
+            Tuple of kind, absolute path, modification time, CONFIG settings and params
+        """
+        sFile = os.path.abspath(sFile)
+        return (kind, sFile, os.stat(sFile).st_mtime_ns, self.config.p, self.config.min) + params
+
+    def get(self, key, fun):
+        """
+        Function:
+            get
+        Description:
+            Looks up a cached value, making it with fun on a miss and dropping the least recently used value when full
+        Input:
+            self - current SERVER instance
+            key - cache key from key
+            fun - function making the value
+        Output:
+            Cached value
+        """
+        with self.guard:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.misses += 1
+        value = fun()
+        with self.guard:
+            self.entries[key] = value
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def table(self, sFile):
+        """
+        Function:
+            table
+        Description:
+            Loads a CSV file into a DATA, or finds it in the cache
+        Input:
+            self - current SERVER instance
+            sFile - path of the CSV file
+        Output:
+            DATA of the file
+        """
+        return self.get(self.key("data", sFile), lambda: DATA(sFile, config=self.config))
+
+    def cluster(self, q):
+        """
+        Function:
+            cluster
+        Description:
+            Clusters a CSV file, keeping the tree in the cache
+        Input:
+            self - current SERVER instance
+            q - request parameters: file, optional seed
+        Output:
+            Nested dictionary of the tree, leaves hold their row indices and the mid of each y column
+        """
+        sFile, seed = q["file"], int(q.get("seed", self.config.seed))
+        data = self.table(sFile)
+        root = self.get(self.key("cluster", sFile, seed), lambda: data.cluster(rng=RNG(seed)))
+        def tree(node):
+            if "left" not in node:
+                return {"n": len(node.rows), "rows": [row.i for row in node.rows],
+                        "mid": {col.txt: col.mid() for col in node.data.cols.y}}
+            return {"n": len(node.rows), "C": node.C, "left": tree(node.left),
+                    "right": tree(node.right) if node.right is not None else None}
+        return tree(root)
+
+    def sway(self, q):
+        """
+        Function:
+            sway
+        Description:
+            Sways a CSV file, keeping the result in the cache
+        Input:
+            self - current SERVER instance
+            q - request parameters: file, optional seed, sample and evals
+        Output:
+            Dictionary of the best rows, the mid of each y column over them and the number of better calls
+        """
+        sFile, seed = q["file"], int(q.get("seed", self.config.seed))
+        sample, evals = q.get("sample"), q.get("evals")
+        sample, evals = sample and int(sample), evals and int(evals)
+        data = self.table(sFile)
+        def sway():
+            root = data.sway(rng=RNG(seed), sample=sample, evals=evals)
+            node = root
+            while node.left is not None:
+                node = node.left
+            return {"rows": [row.i for row in node.rows], "mid": {col.txt: col.mid() for col in node.data.cols.y},
+                    "evals": root.evals}
+        return self.get(self.key("sway", sFile, seed, sample, evals), sway)
+
+    def nearest(self, q):
+        """
+        Function:
+            nearest
+        Description:
+            Finds the rows of a CSV file closest to one of its rows or to a new example
+        Input:
+            self - current SERVER instance
+            q - request parameters checked by params: file, row index or cells as a list, optional k
+        Output:
+            List of the closest rows with their index, cells and distance
+        """
+        data = self.table(q["file"])
+        if "cells" in q:
+            row = DATA([data.cols.names, q["cells"]], None, data.config).rows[0]
+        else:
+            row = data.rows[int(q["row"])]
+        return [{"row": r.i, "cells": r.cells, "dist": d} for r, d in data.nearest(row, int(q.get("k", 1)))]
+
+    def place(self, q):
+        """
+        Function:
+            place
+        Description:
+            Clusters the rows and cols of a repgrid file and places its rows in 2d, keeping the result in the cache
+        Input:
+            self - current SERVER instance
+            q - request parameters: file, optional seed
+        Output:
+            Dictionary of the row and col trees and the place of each row
+        """
+        sFile, seed = q["file"], int(q.get("seed", self.config.seed))
+        def place():
+            t = util.dofile(sFile)
+            rows, cols = util.repViews(t, self.config)
+            root = rows.cluster(rng=RNG(seed))
+            xy = root.xy().tolist()
+            return {"rows": batch.tree(root), "cols": batch.tree(cols.cluster(rng=RNG(seed))),
+                    "place": [{"label": util.last(row.cells), "x": xy[row.i][0], "y": xy[row.i][1]} for row in rows.rows]}
+        return self.get(self.key("place", sFile, seed), place)
+
+    def metrics(self, q):
+        """
+        Function:
+            metrics
+        Description:
+            Reports the cache counters and the latency of recent requests per route
+        Input:
+            self - current SERVER instance
+            q - request parameters, none are used
+        Output:
+            Dictionary of metrics, latencies are in seconds
+        """
+        out = {"cache": {"size": len(self.entries), "hits": self.hits, "misses": self.misses,
+                         "evictions": self.evictions}, "routes": {}}
+        for route, (n, t) in self.latency.items():
+            t = np.array(t)
+            out["routes"][route] = {"requests": n, "mean": float(t.mean()), "p50": float(np.percentile(t, 50)),
+                                    "p95": float(np.percentile(t, 95)), "max": float(t.max())}
+        return out
+
+    def params(self, route, q):
+        """
+        Function:
+            params
+        Description:
+            Checks and converts the parameters of a request before it is routed, so bad parameters
+            fail here, with a 400, and not somewhere inside the route
+        Input:
+            self - current SERVER instance
+            route - name of the route
+            q - request parameters as strings
+        Output:
+            Parameters with seed, k, row, sample and evals as ints and cells as a list
+        """
+        q = dict(q)
+        if route != "metrics" and not os.path.isfile(q["file"]):
+            raise ValueError(f"no file {q['file']}")
+        for k in ["seed", "k", "row", "sample", "evals"]:
+            if k in q:
+                q[k] = int(q[k])
+        if route == "nearest":
+            if "cells" in q:
+                q["cells"] = json.loads(q["cells"])
+                if not isinstance(q["cells"], list):
+                    raise TypeError("cells must be a json list")
+            elif "row" not in q:
+                raise KeyError("row or cells")
+        return q
+
+    def lock(self, sFile):
+        """
+        Function:
+            lock
+        Description:
+            Finds the lock of a file, keeping at most size idle locks, least recently used first out
+        Input:
+            self - current SERVER instance
+            sFile - path of the file, "" for none
+        Output:
+            List of the asyncio Lock and how many requests are using it
+        """
+        sFile = os.path.abspath(sFile) if sFile else ""
+        if sFile not in self.locks:
+            self.locks[sFile] = [asyncio.Lock(), 0]
+        self.locks.move_to_end(sFile)
+        idle = [k for k, (_, users) in self.locks.items() if users == 0 and k != sFile]
+        for k in idle[:max(0, len(self.locks) - self.size)]:
+            del self.locks[k]
+        return self.locks[sFile]
+
+    async def answer(self, route, q):
+        """
+        Function:
+            answer
+        Description:
+            Runs one route in a worker thread so other requests are served meanwhile. Requests on
+            the same file wait for each other, because the file's DATA is shared. metrics runs on
+            the event loop, which is the only place latencies are recorded. Parameters that params
+            rejects, or a row the file does not have, get a 400 and any other error in the route a
+            500, so one bad request is isolated
+        Input:
+            self - current SERVER instance
+            route - name of the route
+            q - request parameters
+        Output:
+            HTTP status and the route's result
+        """
+        if route not in self.routes:
+            return 404, {"error": f"no route {route}, try one of {list(self.routes)}"}
+        start = time.perf_counter()
+        try:
+            q = self.params(route, q)
+        except (KeyError, ValueError, TypeError, OSError) as e:
+            q, status, out = None, 400, {"error": f"{type(e).__name__}: {e}"}
+        if route == "metrics" and q is not None:
+            status, out = 200, self.metrics(q)
+        elif q is not None:
+            lock = self.lock(q.get("file"))
+            lock[1] += 1
+            try:
+                async with lock[0]:
+                    status, out = 200, await asyncio.to_thread(self.routes[route], q)
+            except (KeyError, ValueError, OSError, IndexError) as e:
+                status, out = 400, {"error": f"{type(e).__name__}: {e}"}
+            except Exception as e:
+                status, out = 500, {"error": f"{type(e).__name__}: {e}"}
+            finally:
+                lock[1] -= 1
+        seconds = time.perf_counter() - start
+        n, t = self.latency.setdefault(route, (0, deque(maxlen=1000)))
+        t.append(seconds)
+        self.latency[route] = (n + 1, t)
+        return status, out
+
+    async def handle(self, reader, writer):
+        """
+        Function:
+            handle
+        Description:
+            Serves one HTTP GET request, /route?name=value&..., with a json reply
+        Input:
+            self - current SERVER instance
+            reader - asyncio StreamReader of the connection
+            writer - asyncio StreamWriter of the connection
+        Output:
+            None
+        """
+        try:
+            method, target, _ = (await reader.readline()).decode().split(" ", 2)
+            while (await reader.readline()).strip():
+                pass
+            url = urlsplit(target)
+            q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if method != "GET":
+                status, out = 405, {"error": "only GET is served"}
+            else:
+                status, out = await self.answer(url.path.strip("/"), q)
+        except ValueError:
+            status, out = 400, {"error": "bad request line"}
+        body = json.dumps(out).encode()
+        writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        writer.close()
+
+    async def start(self, host = "127.0.0.1", port = 8793, path = None):
+        """
+        Function:
+            start
+        Description:
+            Starts listening on localhost or on a Unix socket
+        Input:
+            self - current SERVER instance
+            host - address to listen on
+            port - port to listen on, 0 picks a free one
+            path - if set, path of a Unix socket to listen on instead
+        Output:
+            asyncio Server
+        """
+        if path:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+async def fetch(target, host = "127.0.0.1", port = 8793, path = None):
+    """
+    Function:
+        fetch
+    Description:
+        Sends one request to a SERVER
+    Input:
+        target - route and parameters, like "/nearest?file=auto93.csv&row=3"
+        host - address of the server
+        port - port of the server
+        path - if set, path of the server's Unix socket
+    Output:
+        HTTP status and the decoded json reply
+    """
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    await writer.drain()
+    head, body = (await reader.read()).split(b"\r\n\r\n", 1)
+    writer.close()
+    return int(head.split()[1]), json.loads(body)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="serve clustering queries over warm, cached tables")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8793, help="port to listen on")
+    parser.add_argument("-u", "--unix", type=str, default=None, help="Unix socket to listen on instead")
+    parser.add_argument("-n", "--size", type=int, default=8, help="number of tables and results to cache")
+    parser.add_argument("-p", "--p", type=int, default=2, help="distance coefficient")
+    parser.add_argument("-m", "--min", type=float, default=0.5, help="size of smallest cluster")
+    parser.add_argument("-s", "--seed", type=int, default=937162211, help="default random number seed")
+    args = parser.parse_args()
+    the.update(args)
+    async def main():
+        server = await SERVER(the, args.size).start(args.host, args.port, args.unix)
+        async with server:
+            await server.serve_forever()
+    asyncio.run(main())
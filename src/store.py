@@ -0,0 +1,234 @@
+import numpy as np
+from num import NUM
+from row import ROW
+
+class STORE:
+    def __init__(self, cols, size = 64):
+        self.names = cols.names
+        self.n = 0
+        self.rows = []
+        used = set(id(col) for col in cols.x + cols.y)
+        self.isNum = [isinstance(col, NUM) and id(col) in used for col in cols.all]
+        self.num, self.sym, self.miss, self.codes, self.values = {}, {}, {}, {}, {}
+        for at, isNum in enumerate(self.isNum):
+            if isNum:
+                self.num[at] = np.full(size, np.nan)
+            else:
+                self.sym[at] = np.full(size, -1, dtype=np.int32)
+                self.codes[at] = {}
+                self.values[at] = []
+            self.miss[at] = np.zeros(size, dtype=bool)
+
+    def grow(self, size):
+        """
+        Function:
+            grow
+        Description:
+            Makes sure every column array can hold at least size rows, doubling capacity when it runs out
+        Input:
+            self - current STORE instance
+            size - number of rows that must fit
+        Output:
+            None
+        """
+        capacity = len(self.miss[0]) if self.miss else 0
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for at, isNum in enumerate(self.isNum):
+            old = self.num[at] if isNum else self.sym[at]
+            new = np.full(capacity, np.nan) if isNum else np.full(capacity, -1, dtype=np.int32)
+            new[:self.n] = old[:self.n]
+            if isNum:
+                self.num[at] = new
+            else:
+                self.sym[at] = new
+            miss = np.zeros(capacity, dtype=bool)
+            miss[:self.n] = self.miss[at][:self.n]
+            self.miss[at] = miss
+
+    def code(self, at, x):
+        """
+        Function:
+            code
+        Description:
+            Returns the integer code of symbol x in column at, adding it to the dictionary if it is new
+        Input:
+            self - current STORE instance
+            at - column index
+            x - symbol to encode
+        Output:
+            Integer code of x
+        """
+        codes = self.codes[at]
+        if x not in codes:
+            codes[x] = len(self.values[at])
+            self.values[at].append(x)
+        return codes[x]
+
+    def append(self, t):
+        """
+        Function:
+            append
+        Description:
+            Parses one row of raw cells into the column arrays and returns a ROW view of it
+        Input:
+            self - current STORE instance
+            t - list of raw cells
+        Output:
+            row - ROW view of the new row
+        """
+        i = self.n
+        self.grow(i + 1)
+        for at, x in enumerate(t):
+            if x == "?":
+                self.miss[at][i] = True
+            elif self.isNum[at]:
+                self.num[at][i] = float(x)
+            else:
+                self.sym[at][i] = self.code(at, x)
+        self.n += 1
+        row = ROW(self, i)
+        self.rows.append(row)
+        return row
+
+    def extend(self, t):
+        """
+        Function:
+            extend
+        Description:
+            Parses a block of raw rows into the column arrays at once, a column at a time
+        Input:
+            self - current STORE instance
+            t - list of lists of raw cells
+        Output:
+            rows - list of ROW views of the new rows
+        """
+        lo, hi = self.n, self.n + len(t)
+        self.grow(hi)
+        for at, isNum in enumerate(self.isNum):
+            xs = [u[at] for u in t]
+            miss = np.array([x == "?" for x in xs], dtype=bool)
+            self.miss[at][lo:hi] = miss
+            if isNum:
+                self.num[at][lo:hi] = np.array(["nan" if x == "?" else x for x in xs], dtype=float)
+            else:
+                self.sym[at][lo:hi] = [-1 if x == "?" else self.code(at, x) for x in xs]
+        self.n = hi
+        rows = [ROW(self, i) for i in range(lo, hi)]
+        self.rows.extend(rows)
+        return rows
+
+    def adopt(self, columns):
+        """
+        Function:
+            adopt
+        Description:
+            Takes whole columns as the rows of an empty STORE. Float arrays given for NUM columns
+            become the column without being copied, so they can be views into a shared buffer.
+            A STORE that already has rows falls back to extend
+        Input:
+            self - current STORE instance
+            columns - one array or list of raw cells per column, all the same length
+        Output:
+            rows - list of ROW views of the new rows
+        """
+        if self.n:
+            return self.extend([list(u) for u in zip(*columns)])
+        n = len(columns[0]) if columns else 0
+        for at, isNum in enumerate(self.isNum):
+            xs = columns[at]
+            if isNum:
+                if not (isinstance(xs, np.ndarray) and xs.dtype == np.float64):
+                    xs = np.array([np.nan if x == "?" else x for x in xs], dtype=float)
+                self.num[at] = xs
+                self.miss[at] = np.isnan(xs)
+            else:
+                self.sym[at] = np.array([-1 if x == "?" else self.code(at, x) for x in xs], dtype=np.int32)
+                self.miss[at] = self.sym[at] < 0
+        self.n = n
+        rows = [ROW(self, i) for i in range(n)]
+        self.rows.extend(rows)
+        return rows
+
+    def column(self, at):
+        """
+        Function:
+            column
+        Description:
+            Returns the typed array of a column: float64 values for NUMs, integer codes for SYMs
+        Input:
+            self - current STORE instance
+            at - column index
+        Output:
+            Array view of the column, missing values are NaN or -1
+        """
+        return self.num[at][:self.n] if self.isNum[at] else self.sym[at][:self.n]
+
+    def mask(self, at):
+        """
+        Function:
+            mask
+        Description:
+            Returns the missing value mask of a column
+        Input:
+            self - current STORE instance
+            at - column index
+        Output:
+            Boolean array view, True where the cell was "?"
+        """
+        return self.miss[at][:self.n]
+
+    def key(self, row, at):
+        """
+        Function:
+            key
+        Description:
+            Returns a row's cell in the typed form this STORE keeps for column at. Rows from
+            another STORE are encoded on the fly, symbols this STORE has never seen get code -2
+        Input:
+            self - current STORE instance
+            row - ROW to read
+            at - column index
+        Output:
+            Float (NaN if missing) for NUM columns, integer code (-1 if missing) for SYM columns
+        """
+        if row.store is self:
+            return self.column(at)[row.i]
+        x = row.cell(at)
+        if self.isNum[at]:
+            return np.nan if x == "?" else float(x)
+        return -1 if x == "?" else self.codes[at].get(x, -2)
+
+    def cell(self, i, at):
+        """
+        Function:
+            cell
+        Description:
+            Returns one cell, decoded back to a float or the original symbol
+        Input:
+            self - current STORE instance
+            i - row index
+            at - column index
+        Output:
+            Value of the cell or "?" if it is missing
+        """
+        if self.miss[at][i]:
+            return "?"
+        if self.isNum[at]:
+            return float(self.num[at][i])
+        return self.values[at][self.sym[at][i]]
+
+    def cells(self, i):
+        """
+        Function:
+            cells
+        Description:
+            Returns every cell of a row
+        Input:
+            self - current STORE instance
+            i - row index
+        Output:
+            List of decoded cells
+        """
+        return [self.cell(i, at) for at in range(len(self.names))]
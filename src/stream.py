@@ -0,0 +1,82 @@
+import csv
+import time
+from itertools import islice
+from data import DATA
+
+class STREAM:
+    def __init__(self, sFilename, chunk = 65536, fun = None):
+        self.file = sFilename
+        self.chunk = chunk
+        self.fun = fun
+        self.rows = 0
+        self.chunks = 0
+        self.chars = 0
+        self.seconds = 0
+
+    def load(self):
+        """
+        Function:
+            load
+        Description:
+            Reads the CSV file into a DATA a chunk of records at a time. Column roles come from the
+            header via COLS, each chunk is added column by column with DATA.adopt, so at most chunk
+            records are held in memory at once. An empty file raises ValueError. One csv reader runs
+            over the whole file, so quoted fields holding newlines are never cut between chunks,
+            and blank lines are skipped
+        Input:
+            self - current STREAM instance
+        Output:
+            data - DATA of the whole file
+        """
+        start = time.perf_counter()
+        def lines(file):
+            for line in file:
+                self.chars += len(line)
+                yield line
+        with open(self.file, mode='r', newline='') as file:
+            reader = csv.reader(lines(file))
+            header = next(reader, None)
+            if not header:
+                raise ValueError(self.file + " has no header")
+            data = DATA([header])
+            while True:
+                block = list(islice(reader, self.chunk))
+                if not block:
+                    break
+                block = [line for line in block if line]
+                if not block:
+                    continue
+                data.adopt(list(zip(*block)))
+                self.rows += len(block)
+                self.chunks += 1
+                self.seconds = time.perf_counter() - start
+                if self.fun:
+                    self.fun(self)
+        self.seconds = time.perf_counter() - start
+        return data
+
+    def rate(self):
+        """
+        Function:
+            rate
+        Description:
+            Returns the throughput so far
+        Input:
+            self - current STREAM instance
+        Output:
+            Rows read per second
+        """
+        return self.rows / self.seconds if self.seconds else 0
+
+    def report(self):
+        """
+        Function:
+            report
+        Description:
+            Summarises progress as a single line
+        Input:
+            self - current STREAM instance
+        Output:
+            Progress string
+        """
+        return f"{self.rows} rows, {self.chunks} chunks, {self.chars} chars in {self.seconds:.3f}s ({self.rate():.0f} rows/s)"
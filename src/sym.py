@@ -1,6 +1,9 @@
 import math
+import numpy as np
 
 class SYM:
+    __slots__ = ("at", "txt", "n", "has", "most", "mode")
+
     def __init__(self, at = 0, txt = ""):
         self.at = at
         self.txt = txt
@@ -28,6 +31,80 @@ class SYM:
                 self.most = self.has[x]
                 self.mode = x
 
+    def addMany(self, xs):
+        """
+        Function:
+            addMany
+        Description:
+            Adds a whole array of symbols at once by counting them and merging the counts in
+        Input:
+            self - current SYM instance
+            xs - symbols to add, "?" symbols are skipped
+        Output:
+            None
+        """
+        other = SYM(self.at, self.txt)
+        for x in xs:
+            if x != "?":
+                other.has[x] = 1 + other.has.get(x, 0)
+        other.n = sum(other.has.values())
+        self.merge(other)
+
+    def merge(self, other):
+        """
+        Function:
+            merge
+        Description:
+            Folds another SYM's counts into this one and recomputes the mode
+        Input:
+            self - current SYM instance
+            other - SYM counting other symbols of the same column
+        Output:
+            self
+        """
+        self.n += other.n
+        for x, n in other.has.items():
+            self.has[x] = n + self.has.get(x, 0)
+        self.remode()
+        return self
+
+    def sub(self, other):
+        """
+        Function:
+            sub
+        Description:
+            Takes another SYM's counts back out of this one, the reverse of merge
+        Input:
+            self - current SYM instance
+            other - SYM counting symbols that were merged or added into this one
+        Output:
+            self
+        """
+        for x, n in other.has.items():
+            left = self.has.get(x, 0) - n
+            self.n -= min(n, self.has.get(x, 0))
+            if left > 0:
+                self.has[x] = left
+            else:
+                self.has.pop(x, None)
+        self.remode()
+        return self
+
+    def remode(self):
+        """
+        Function:
+            remode
+        Description:
+            Recomputes most and mode from the counts, keeping the current mode when it ties
+        Input:
+            self - current SYM instance
+        Output:
+            None
+        """
+        self.most = max(self.has.values(), default=0)
+        if self.has.get(self.mode, 0) != self.most or not self.has:
+            self.mode = next((x for x, n in self.has.items() if n == self.most), None)
+
     def mid(self):
         """
         Function:
@@ -75,3 +152,23 @@ class SYM:
             1 - there is a difference between symbols or both symbols are '?'
         """
         return 1 if (s1 == "?" and s2 == "?") else 0 if (s1 == s2) else 1
+
+    def dists(self, s1, ss):
+        """
+        Function:
+            dists
+        Description:
+            Vectorized dist from one symbol code to an array of codes, missing symbols are coded as -1.
+            s1 can also be an array, which is broadcast against ss
+        Input:
+            self - current SYM instance
+            s1 - code of the first symbol
+            ss - Array of symbol codes
+        Output:
+            Array of 0 where the symbols match and 1 where they differ or are missing
+        """
+        if np.ndim(s1):
+            return np.where(s1 < 0, 1.0, (ss != s1).astype(float))
+        if s1 < 0:
+            return np.ones(len(ss))
+        return (ss != s1).astype(float)
@@ -0,0 +1,138 @@
+import json
+import mmap
+import numpy as np
+from data import DATA
+from num import NUM
+from row import ROW
+from store import STORE
+from stream import STREAM
+
+magic = b"GRIDTBL1"
+
+def summary(col):
+    """
+    Function:
+        summary
+    Description:
+        Turns a NUM or SYM summary into something json can write
+    Input:
+        col - NUM or SYM
+    Output:
+        Dictionary of the summary
+    """
+    if isinstance(col, NUM):
+        return {"n": col.n, "mu": col.mu, "m2": col.m2, "lo": col.lo, "hi": col.hi}
+    return {"n": col.n, "has": list(col.has.items()), "most": col.most, "mode": col.mode}
+
+def unsummary(col, t):
+    """
+    Function:
+        unsummary
+    Description:
+        Loads a summary written by summary back into a NUM or SYM
+    Input:
+        col - NUM or SYM to load into
+        t - Dictionary of the summary
+    Output:
+        None
+    """
+    if isinstance(col, NUM):
+        col.n, col.mu, col.m2, col.lo, col.hi = t["n"], t["mu"], t["m2"], t["lo"], t["hi"]
+    else:
+        col.n, col.has, col.most, col.mode = t["n"], dict(t["has"]), t["most"], t["mode"]
+
+def save(data, sFilename):
+    """
+    Function:
+        save
+    Description:
+        Writes a DATA to the binary table format: magic, header length, a json header with the
+        column names, roles, symbol dictionaries and summaries, then every column's values and
+        missing mask, column after column, each aligned to 8 bytes
+    Input:
+        data - DATA to write
+        sFilename - path of the file to write
+    Output:
+        None
+    """
+    store, idx = data.store, np.fromiter((row.i for row in data.rows), dtype=np.int64, count=len(data.rows))
+    blocks, columns, offset = [], [], 0
+    for at, isNum in enumerate(store.isNum):
+        for kind, a in [("data", store.column(at)[idx]), ("mask", store.mask(at)[idx])]:
+            a = np.ascontiguousarray(a)
+            columns.append({"at": at, "kind": kind, "dtype": a.dtype.str, "offset": offset})
+            blocks.append(a)
+            offset += -(-a.nbytes // 8) * 8
+    header = json.dumps({"names": data.cols.names, "n": len(idx), "isNum": store.isNum,
+                         "values": {str(at): v for at, v in store.values.items()},
+                         "cols": [summary(col) for col in data.cols.all], "columns": columns}).encode()
+    start = -(-(len(magic) + 8 + len(header)) // 8) * 8
+    with open(sFilename, "wb") as f:
+        f.write(magic + len(header).to_bytes(8, "little") + header)
+        f.write(b"\0" * (start - f.tell()))
+        for a in blocks:
+            f.write(a.tobytes())
+            f.write(b"\0" * (-a.nbytes % 8))
+
+def load(sFilename):
+    """
+    Function:
+        load
+    Description:
+        Opens a binary table as a DATA. The columns are read-only numpy views straight onto an
+        mmap of the file, so nothing is parsed or copied and other processes opening the same
+        file share its pages. Column summaries come from the header instead of re-adding rows
+    Input:
+        sFilename - path of the file to open
+    Output:
+        data - DATA over the mapped columns
+    """
+    with open(sFilename, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mm[:len(magic)] != magic:
+        raise ValueError(sFilename + " is not a binary table")
+    size = int.from_bytes(mm[len(magic):len(magic) + 8], "little")
+    header = json.loads(mm[len(magic) + 8:len(magic) + 8 + size])
+    start = -(-(len(magic) + 8 + size) // 8) * 8
+    data = DATA([header["names"]])
+    store, n = STORE(data.cols, 0), header["n"]
+    store.isNum = header["isNum"]
+    for col in header["columns"]:
+        a = np.frombuffer(mm, dtype=np.dtype(col["dtype"]), count=n, offset=start + col["offset"])
+        if col["kind"] == "mask":
+            store.miss[col["at"]] = a
+        elif store.isNum[col["at"]]:
+            store.num[col["at"]] = a
+        else:
+            store.sym[col["at"]] = a
+    for at, values in header["values"].items():
+        store.values[int(at)] = values
+        store.codes[int(at)] = {x: code for code, x in enumerate(values)}
+    store.n = n
+    store.rows = [ROW(store, i) for i in range(n)]
+    data.store, data.rows = store, list(store.rows)
+    for col, t in zip(data.cols.all, header["cols"]):
+        unsummary(col, t)
+    return data
+
+def convert(src, dst, what = "rows"):
+    """
+    Function:
+        convert
+    Description:
+        Converts a CSV file or a repgrid .json file to the binary table format
+    Input:
+        src - path of the .csv or repgrid .json file
+        dst - path of the binary table to write
+        what - for repgrid files, "rows" to write the repRows view or "cols" for the repCols view
+    Output:
+        data - DATA that was written
+    """
+    if src.endswith(".json"):
+        import utility as util
+        t = util.dofile(src)
+        data = util.repRows(t) if what == "rows" else util.repCols(t["cols"])
+    else:
+        data = STREAM(src).load()
+    save(data, dst)
+    return data
@@ -1,13 +1,69 @@
-from utility import *
+import utility
+from utility import eg, getCliArgs, printCLIvalues
 
-eg("crash", "show crashing behavior", crashFunc)
-eg("the", "show settings", oo)
-eg("copy", "check copy", copyFunc)
-eg("sym","check syms", symFunc)
-eg("num", "check nums", numFunc)
-eg("repcols", "checking repcols", repColsFunc)
-eg("synonyms","checking repcols cluster", synonymsFunc)
-eg("reprows","checking reprows", reprowsFunc)
-eg("prototypes","checking reprows cluster", prototypesFunc)
-eg("position","where's wally", positionFunc)
-eg("every","the whole enchilada", everyFunc)
\ No newline at end of file
+examples = {"crash": ("show crashing behavior", "crashFunc"),
+            "the": ("show settings", "oo"),
+            "copy": ("check copy", "copyFunc"),
+            "sym": ("check syms", "symFunc"),
+            "num": ("check nums", "numFunc"),
+            "store": ("check columnar store", "storeFunc"),
+            "dists": ("check vectorized distances", "distsFunc"),
+            "nearest": ("check nearest rows", "nearestFunc"),
+            "nodes": ("check cluster tree nodes", "nodesFunc"),
+            "merge": ("check merging summaries", "mergeFunc"),
+            "parallel": ("check parallel clustering", "parallelFunc"),
+            "rng": ("check random number generators", "rngFunc"),
+            "stream": ("check streaming csv loader", "streamFunc"),
+            "table": ("check binary tables", "tableFunc"),
+            "cache": ("check distance cache", "cacheFunc"),
+            "batch": ("check batch repgrids", "batchFunc"),
+            "insert": ("check inserting into cluster trees", "insertFunc"),
+            "tree": ("check saving cluster trees", "treeFunc"),
+            "sway": ("check sway", "swayFunc"),
+            "betters": ("check vectorized domination", "bettersFunc"),
+            "bench": ("check benchmark suite", "benchFunc"),
+            "probe": ("check hot path instrumentation", "probeFunc"),
+            "index": ("check nearest neighbour index", "indexFunc"),
+            "prune": ("check pruned pole distances", "pruneFunc"),
+            "library": ("check library use without the CLI", "libraryFunc"),
+            "server": ("check clustering server", "serverFunc"),
+            "memory": ("check memory report", "memoryFunc"),
+            "coords": ("check per depth projections", "coordsFunc"),
+            "place": ("check placement renderer", "placeFunc"),
+            "repcols": ("checking repcols", "repColsFunc"),
+            "synonyms": ("checking repcols cluster", "synonymsFunc"),
+            "reprows": ("checking reprows", "reprowsFunc"),
+            "repviews": ("checking reprows and repcols share the ratings", "repviewsFunc"),
+            "prototypes": ("checking reprows cluster", "prototypesFunc"),
+            "position": ("where's wally", "positionFunc"),
+            "every": ("the whole enchilada", "everyFunc")}
+
+def example(key):
+    """
+    Function:
+        example
+    Description:
+        Looks up an example's callback in utility and registers it with eg the first time it is asked for,
+        so importing testfile registers nothing
+    Input:
+        key - name of the example
+    Output:
+        Callback function of the example
+    """
+    if key not in utility.egs:
+        string, name = examples[key]
+        eg(key, string, getattr(utility, name))
+    return utility.egs[key]
+
+def usage():
+    """
+    Function:
+        usage
+    Description:
+        Builds the help string, listing every example without registering any
+    Input:
+        None
+    Output:
+        Help string
+    """
+    return utility.help + "".join(f"  -g {key}    {string}" for key, (string, _) in examples.items())
@@ -0,0 +1,112 @@
+import json
+import numpy as np
+from node import NODE
+
+def stats(node):
+    """
+    Function:
+        stats
+    Description:
+        Collects the summary of every x and y column of a node
+    Input:
+        node - cluster tree NODE
+    Output:
+        Dictionary of column name to [mid, div]
+    """
+    cols = node["data"].cols
+    return {col.txt: [col.mid(), col.div()] for col in cols.x + cols.y}
+
+def nulls(x):
+    """
+    Function:
+        nulls
+    Description:
+        Swaps NaN for None in floats, arrays and nested lists and dictionaries, so json writes null instead of NaN
+    Input:
+        x - value to clean
+    Output:
+        Value with every NaN replaced by None
+    """
+    if isinstance(x, np.ndarray):
+        return np.where(np.isnan(x), None, x).tolist()
+    if isinstance(x, dict):
+        return {k: nulls(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [nulls(v) for v in x]
+    return None if isinstance(x, float) and x != x else x
+
+def save(root, sFilename):
+    """
+    Function:
+        save
+    Description:
+        Writes a cluster or sway tree as json lines. The first line holds the column names and
+        one order of row indices in which every node's rows are contiguous, then each node
+        follows in preorder with its slice of that order, its poles, mid and C as row indices,
+        how many children it has and its column summaries. The root's projection coords go in the first line too.
+        Missing values, like coords of rows that never reached a depth, are written as null so every line is strict json
+    Input:
+        root - root NODE of the tree
+        sFilename - path of the file to write
+    Output:
+        None
+    """
+    order, lines = [], []
+    def lay(node):
+        line = {"lo": len(order), "kids": 0, "inserted": node.inserted}
+        lines.append(line)
+        done = set()
+        for kid in [node.left, node.right]:
+            if kid is not None:
+                line["kids"] += 1
+                start = len(order)
+                lay(kid)
+                done.update(order[start:])
+        order.extend(row.i for row in node.rows if row.i not in done)
+        line["hi"] = len(order)
+        if node.left is not None:
+            line.update({"A": node.A.i, "B": node.B.i, "mid": node.mid.i, "C": node.C})
+        line["stats"] = stats(node)
+    lay(root)
+    with open(sFilename, "w") as f:
+        coords = nulls(root.coords) if root.coords is not None else None
+        f.write(json.dumps({"names": root.source.cols.names, "n": root.source.store.n, "order": order,
+                            "coords": coords}, allow_nan=False) + "\n")
+        for line in lines:
+            f.write(json.dumps(nulls(line), allow_nan=False) + "\n")
+
+def load(sFilename, data):
+    """
+    Function:
+        load
+    Description:
+        Rebuilds a tree written by save against the DATA it was clustered from, without clustering
+        again. The saved column summaries are kept on each node as stats
+    Input:
+        sFilename - path of the file to read
+        data - DATA the tree was made from
+    Output:
+        root - root NODE of the tree
+    """
+    with open(sFilename) as f:
+        header = json.loads(f.readline())
+        lines = [json.loads(line) for line in f]
+    if header["names"] != data.cols.names or header["n"] > data.store.n:
+        raise ValueError(sFilename + " was not saved from this data")
+    order, rows, lines = np.array(header["order"], dtype=np.int64), data.store.rows, iter(lines)
+    def grow():
+        line = next(lines)
+        node = NODE(data, order, line["lo"], line["hi"])
+        node.inserted, node.stats = line["inserted"], line["stats"]
+        if "A" in line:
+            node.A, node.B, node.mid, node.C = rows[line["A"]], rows[line["B"]], rows[line["mid"]], line["C"]
+        if line["kids"] > 0:
+            node.left = grow()
+        if line["kids"] > 1:
+            node.right = grow()
+        return node
+    root = grow()
+    if header.get("coords") is not None:
+        coords = np.array(header["coords"], dtype=float)
+        root.coords = coords.reshape(len(coords), -1, 2) if coords.size else np.full((len(coords), 0, 2), np.nan)
+    return root
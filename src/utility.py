@@ -1,11 +1,17 @@
 import argparse
-import csv
+import glob
 import json
 import math
 import os
+import shutil
+import tempfile
+import numpy as np
 from num import NUM
 from sym import SYM
 from data import DATA
+from rng import RNG
+from lib import Rng, rint, kap, rand, power, cosine, any, readCSV
+import config
 from copy import deepcopy
 
 help = """
@@ -19,14 +25,16 @@ OPTIONS:
   -f  --file    name of file           = ../etc/data/repgrid1.csv
   -g  --go      start-up action        = data
   -h  --help    show help              = false
+  -m  --min     size of smallest cluster = .5
   -p  --p       distance coefficient   = 2
+  -P  --probe   count and time hot paths = false
+      --profile write cProfile stats to file = none
   -s  --seed    random number seed     = 937162211
 
 ACTIONS:
 """
 
 args = None
-Seed = 937162211
 egs = {}
 n = 0
 
@@ -42,10 +50,25 @@ def print_all_attributes(obj):
         Formatted string of all class instance attributes and their values
     """
     stringToPrint = "{ "
-    for attr, value in vars(obj).items():
+    for attr, value in attributes(obj).items():
         stringToPrint += str(attr) + ": " + str(value) + " "
     return stringToPrint + "}"
 
+def attributes(obj):
+    """
+    Function:
+        attributes
+    Description:
+        Collects the attributes of an object, like vars, including objects with __slots__ such as ROW, NUM and SYM
+    Input:
+        obj - Object whose attributes are collected
+    Output:
+        Dictionary of attribute names and values
+    """
+    if hasattr(obj, "__slots__"):
+        return {k: getattr(obj, k) for k in obj.__slots__ if hasattr(obj, k)}
+    return vars(obj)
+
 def dofile(filename):
     """
     Function:
@@ -65,63 +88,89 @@ def transpose(t):
     Function:
         transpose
     Description:
-        Transposes matrix
+        Transposes matrix. Arrays, like the ratings of repArray, are transposed as a view keeping
+        their dtype, lists of lists are transposed as lists
     Input:
         t - Matrix to be transposed
     Output:
         u - Transposed matrix
     """
-    u = []
-    for i in range(len(t[0])):
-        u.append([t[j][i] for j in range(len(t))])
-    return u
+    return t.T if isinstance(t, np.ndarray) else [list(u) for u in zip(*t)]
 
-def repCols(cols):
+def repArray(cols):
+    """
+    Function:
+        repArray
+    Description:
+        Parses the ratings of repgrid cols into one float array, "?" ratings become NaN
+    Input:
+        cols - repgrid cols, each one [left label, ratings..., right label]
+    Output:
+        Array with a row per construct and a column per element
+    """
+    try:
+        return np.array([col[1:-1] for col in cols], dtype=float)
+    except (TypeError, ValueError):
+        return np.array([[np.nan if x == "?" else x for x in col[1:-1]] for col in cols], dtype=float)
+
+def repCols(cols, ratings = None, config = None):
     """
     Function:
         repCols
     Description:
-        Turns repgrid cols into DATA object
+        Turns repgrid cols into DATA object. The element columns are views into one array of ratings
     Input:
         cols - Cols to be manipulated for DATA object conversion
+        ratings - repArray of cols, parsed from cols by default
+        config - CONFIG of the DATA, config.the by default
     Output:
         DATA object of cols
     """
-    copyCols = deepcopy(cols)
-    for col in copyCols:
-        col[-1] = str(col[0]) + ":" + str(col[-1])
-        for j in range(1, len(col)):
-            col[j - 1] = col[j]
-        col.pop()
-    copyCols.insert(0, ['Num' + str(k) for k in range(len(copyCols[0]))])
-    copyCols[0][-1] = "thingX"
-    return DATA(copyCols)
+    ratings = repArray(cols) if ratings is None else ratings
+    data = DATA([['Num' + str(k) for k in range(ratings.shape[1])] + ["thingX"]], config=config)
+    data.adopt(list(transpose(ratings)) + [[str(col[0]) + ":" + str(col[-1]) for col in cols]])
+    return data
 
-def repRows(t, rows, u=None):
+def repRows(t, rows = None, u = None, ratings = None, config = None):
     """
     Function:
         repRows
     Description:
-        Turns repgrid rows into DATA object
+        Turns repgrid rows into DATA object. The construct columns are views into one array of ratings
     Input:
         t - Dictionary of repgrid data
-        rows - Rows to be manipulated for DATA object conversion
+        rows - Rows to be manipulated for DATA object conversion, transpose(t["cols"]) by default
+        u - unused, kept so older calls still work
+        ratings - repArray of the cols, parsed from them by default
+        config - CONFIG of the DATA, config.the by default
     Output:
         DATA object of rows
     """
-    rows = deepcopy(rows)
-    for j, s in enumerate(rows[-1]):
-        rows[0][j] = str(rows[0][j]) + ":" + str(s)
-    rows.pop()
-    for n, row in enumerate(rows):
-        if n==0:
-            row.append("thingX")
-        else:
-            u = t["rows"][len(t["rows"]) - n]
-            row.append(u[-1])
-    return DATA(rows)
+    cols = t["cols"] if rows is None else transpose(rows)
+    ratings = repArray(cols) if ratings is None else ratings
+    data = DATA([[str(col[0]) + ":" + str(col[-1]) for col in cols] + ["thingX"]], config=config)
+    labels = [t["rows"][len(t["rows"]) - n][-1] for n in range(1, ratings.shape[1] + 1)]
+    data.adopt([ratings[j] if data.store.isNum[j] else cols[j][1:-1] for j in range(len(cols))] + [labels])
+    return data
 
-def repPlace(data):
+def repViews(t, config = None):
+    """
+    Function:
+        repViews
+    Description:
+        Turns a repgrid into its rows and cols DATA objects, parsing the ratings once so both
+        views hold slices of the same array
+    Input:
+        t - Dictionary of repgrid data
+        config - CONFIG of both DATAs, config.the by default
+    Output:
+        rows - DATA object of rows, as repRows makes
+        cols - DATA object of cols, as repCols makes
+    """
+    ratings = repArray(t["cols"])
+    return repRows(t, ratings=ratings, config=config), repCols(t["cols"], ratings, config)
+
+def repPlace(data, tree = None, depth = 0, n = 20, what = "text", sFile = None):
     """
     Function:
         repPlace
@@ -129,25 +178,18 @@ def repPlace(data):
         Turns a clustered repgrid object and turns it into a 2d grid
     Input:
         data - repgrid data
+        tree - cluster tree of data, data.tree by default
+        depth - depth of the tree whose projections are placed, 0 for the split of the root
+        n - resolution of the grid
+        what - "text", "csv", "ppm" or "svg"
+        sFile - path to write to, stdout by default
     Output:
-        None
+        Array of how many rows fell in each cell
     """
-    n,g = 20,[]
-    for i in range(n+1):
-        g.append([])
-        for j in range(n+1):
-            g[i].append(" ")
-    maxy = 0
-    print("")
-    for r, row in enumerate(data.rows):
-        c = chr(r+65)
-        print(c, last(row.cells))
-        x, y = int(row.x*n), int(row.y*n)
-        maxy = max(maxy, y)
-        g[y][x] = c
-    print("")
-    for y in range(maxy):
-        print("{" + "".join(g[y]) + "}")
+    import place
+    xy = (tree or data.tree).xy(depth)
+    idx = [row.i for row in data.rows]
+    return place.render(xy[idx], [last(row.cells) for row in data.rows], what, n, sFile)
 
 def repgrid(sFile):
     """
@@ -160,9 +202,7 @@ def repgrid(sFile):
     Output:
         None
     """
-    t = dofile(sFile)
-    rows = repRows(t, transpose(t["cols"]))
-    cols = repCols(t["cols"])
+    rows, cols = repViews(dofile(sFile))
     show(rows.cluster())
     show(cols.cluster())
     repPlace(rows)
@@ -205,26 +245,13 @@ def last(t):
     """
     return t[-1]
 
-def rint(lo = None, hi = None):
-    """
-    Function:
-        rint
-    Description:
-        Makes a random number
-    Input:
-        low - low value
-        high - high value
-    Output:
-        Random number
-    """
-    return math.floor(0.5 + rand(lo, hi))
-
 def eg(key, string, fun):
     """
     Function:
         eg
     Description:
-        Creates an example test case and adds it to the dictionary of test cases. Appends the key/value to the actions of the help string
+        Creates an example test case and adds it to the dictionary of test cases. The actions of the
+        help string are listed by testfile.usage, so they are not added here
     Input:
         key - key of argument
         string - value of argument as a string
@@ -233,126 +260,784 @@ def eg(key, string, fun):
         None
     """
     global egs
-    global help
     egs[key] = fun
-    help += f"  -g {key}    {string}"
 
 def oo():
     pass
 
-def kap(listOfCols, fun):
+def symFunc():
     """
     Function:
-        kap
+        symFunc
     Description:
-        Creates map that stores functions as value
+        Callback function to test SYM class
     Input:
-        listOfCols - list of columns
-        fun - anonymous function to be used as value in map
+        None
     Output:
-        u - map of anonymous functions
+        'a' is the median value in the array and that the div to 3 decimal points equals 1.379 as a boolean
     """
-    u = {}
-    for k, v in enumerate(listOfCols):
-        v, k = fun(v)
-        u[k or len(u)+1] = v
-    return u
+    sym = SYM()
+    for i in ["a","a","a","a","b","b","c"]:
+        sym.add(i)
+    return "a" == sym.mid() and 1.379 == round(sym.div(), ndigits=3)
 
-def rand(low, high):
+def numFunc():
     """
     Function:
-        rand
+        numFunc
     Description:
-        Creates a random number
+        Callback function to test the NUM class
     Input:
-        low - low value
-        high - high value
+        None
     Output:
-        Random number
+        The mean equals 11/7 and the div equals 0.787 as a boolean
     """
-    global Seed
-    low, high = low or 0, high or 1
-    Seed = (16807 * Seed) % 2147483647
-    return low + (high - low) * Seed / 2147483647
+    num = NUM()
+    for element in [1,1,1,1,2,2,3]:
+        num.add(element)
+    return 11/7 == num.mid() and 0.787 == round(num.div(), ndigits=3)
 
-def cosine(a, b, c):
+def crashFunc():
     """
     Function:
-        cosine
+        crashFunc
     Description:
-        Finds x, y of line between a & b
+        Callback function to test crashes
     Input:
-        a - First point
-        b - Second point
-        c - distance between a & b
+        None
     Output:
-        x2 - x of line between a & b
-        y - y of line between a & b
+        an instance of NUM doesn't have the property 'some.missing.nested.field'
     """
-    x1 = (a ** 2 + c ** 2 - b ** 2) / (2 * c)
-    x2 = max(0, min(1, x1))
-    y = (abs(a ** 2 - x2 ** 2)) ** 0.5
-    return x2, y
+    num = NUM()
+    return not hasattr(num, 'some.missing.nested.field')
 
-def any(t):
+def storeFunc():
     """
     Function:
-        any
+        storeFunc
     Description:
-        Selects a random row
+        Callback function to test the columnar STORE behind DATA
     Input:
-        t - DATA object
+        None
     Output:
-        Random row from t
+        NUM columns are float arrays, SYM columns are coded and "?" cells are masked as a boolean
     """
-    rintVal = rint(None, len(t) - 1)
-    return t[rintVal]
+    script_dir = os.path.dirname(__file__)
+    data = DATA(os.path.join(script_dir, "../etc/data/auto93.csv"))
+    store = data.store
+    lbs = store.column(3)
+    hp = store.column(2)
+    return (store.n == len(data.rows)
+            and lbs.dtype.kind == "f" and hp.dtype.kind == "i"
+            and lbs[0] == 4732.0 and data.rows[0].cell(3) == 4732.0
+            and store.mask(2).sum() == sum(1 for row in data.rows if row.cell(2) == "?")
+            and data.rows[0].cells[-1] == 10.0
+            and data.clone(data.rows[:5]).store is store)
 
-def symFunc():
+def distsFunc():
     """
     Function:
-        symFunc
+        distsFunc
     Description:
-        Callback function to test SYM class
+        Callback function to test the vectorized distance kernel against the scalar DATA.dist
     Input:
         None
     Output:
-        'a' is the median value in the array and that the div to 3 decimal points equals 1.379 as a boolean
+        dists, around and furthest agree with dist for every row, including rows with "?" cells, up to
+        rounding in the last bits, for the p = 2 default and for p = 1 and p = 3
     """
-    sym = SYM()
-    for i in ["a","a","a","a","b","b","c"]:
-        sym.add(i)
-    return "a" == sym.mid() and 1.379 == round(sym.div(), ndigits=3)
+    script_dir = os.path.dirname(__file__)
+    tables = [DATA(os.path.join(script_dir, "../etc/data/auto93.csv")),
+              DATA([["Aa", "Bb", "cc", "Dd"], [1, "?", "x", 4], ["?", 3, "?", 1], [2, 5, "y", 9], ["?", "?", "x", 2], [0, 1, "?", "?"]])]
+    for data in tables + [DATA(os.path.join(script_dir, "../etc/data/auto93.csv"), config=config.CONFIG(p=p)) for p in [1, 3]]:
+        cols = data.cols.x + data.cols.y
+        for row1 in data.rows[:20]:
+            d = data.dists(row1, data.rows, cols).tolist()
+            if not np.allclose(d, [data.dist(row1, row2, cols) for row2 in data.rows], rtol=0, atol=10 ** -12):
+                return False
+            t = data.around(row1, data.rows, cols)
+            if [dist for _, dist in t] != sorted(d) or data.furthest(row1, data.rows, cols) is not t[-1][0]:
+                return False
+    return True
 
-def numFunc():
+def nearestFunc():
     """
     Function:
-        numFunc
+        nearestFunc
     Description:
-        Callback function to test the NUM class
+        Callback function to test nearest and furthest against a full sort by around
     Input:
         None
     Output:
-        The mean equals 11/7 and the div equals 0.787 as a boolean
+        nearest returns the head of around and furthest its tail for several rows and k
     """
-    num = NUM()
-    for element in [1,1,1,1,2,2,3]:
-        num.add(element)
-    return 11/7 == num.mid() and 0.787 == round(num.div(), ndigits=3)
+    script_dir = os.path.dirname(__file__)
+    data = DATA(os.path.join(script_dir, "../etc/data/auto93.csv"))
+    for row1 in data.rows[:10]:
+        t = data.around(row1)
+        if data.furthest(row1, data.rows) is not t[-1][0]:
+            return False
+        for k in [0, 1, 5, 50, len(t) + 1]:
+            if [(row.i, d) for row, d in data.nearest(row1, k)] != [(row.i, d) for row, d in t[:k]]:
+                return False
+    return True
 
-def crashFunc():
+def nodesFunc():
     """
     Function:
-        crashFunc
+        nodesFunc
     Description:
-        Callback function to test crashes
+        Callback function to test the cluster tree NODEs
     Input:
         None
     Output:
-        an instance of NUM doesn't have the property 'some.missing.nested.field'
+        every node's rows are its children's rows and summaries are only built when asked for
     """
-    num = NUM()
-    return not hasattr(num, 'some.missing.nested.field')
+    script_dir = os.path.dirname(__file__)
+    t = dofile(os.path.join(script_dir, args.file))
+    rows = repRows(t)
+    def ok(node):
+        if "left" not in node:
+            return node.cache is None and len(node["data"].rows) == 1 and node.cache is not None
+        return (node.rows == node["left"].rows + node["right"].rows
+                and ok(node["left"]) and ok(node["right"]))
+    tree = rows.cluster(rng=RNG(args.seed))
+    if not ok(tree):
+        return False
+    return tree["data"].stats("mid", rows.cols.x, 6) == rows.clone(rows.rows).stats("mid", rows.cols.x, 6)
+
+def mergeFunc():
+    """
+    Function:
+        mergeFunc
+    Description:
+        Callback function to test merging, subtracting and bulk adding NUM and SYM summaries
+    Input:
+        None
+    Output:
+        merged summaries match summaries built one value at a time
+    """
+    def close(a, b):
+        return abs(a - b) < 10 ** -9
+    t = [1, 1, 1, 1, 2, 2, 3, "?", 10, 7.5, 4, 4]
+    num, num1, num2 = NUM(), NUM(), NUM()
+    for x in t:
+        num.add(x)
+    for x in t[:5]:
+        num1.add(x)
+    num2.addMany(t[5:])
+    merged = NUM().merge(num1).merge(num2)
+    if not (merged.n == num.n and close(merged.mid(), num.mid()) and close(merged.div(), num.div())
+            and merged.lo == num.lo and merged.hi == num.hi):
+        return False
+    merged.sub(num2)
+    if not (merged.n == num1.n and close(merged.mid(), num1.mid()) and close(merged.div(), num1.div())):
+        return False
+    s = ["a", "a", "a", "a", "b", "b", "c", "?"]
+    sym, sym1, sym2 = SYM(), SYM(), SYM()
+    for x in s:
+        sym.add(x)
+    sym1.addMany(s[4:])
+    for x in s[:4]:
+        sym2.add(x)
+    sym1.merge(sym2)
+    if not (sym1.n == sym.n and sym1.mid() == "a" and sym1.has == {"b": 2, "c": 1, "a": 4}):
+        return False
+    sym1.sub(sym2)
+    return sym1.n == 3 and sym1.mid() == "b" and "a" not in sym1.has
+
+def parallelFunc():
+    """
+    Function:
+        parallelFunc
+    Description:
+        Callback function to test clustering subtrees in a process pool
+    Input:
+        None
+    Output:
+        the parallel tree, row order, projections and pruned count are the same as the serial ones, and
+        subtrees were actually sent to the pool, including with the default threshold
+    """
+    def run(workers, n = 300, threshold = 16):
+        data = DATA([["Aa", "Bb", "Cc", "dd"]] + [[(37 * i) % 101, (i * i) % 97, (13 * i) % 89, "xyz"[i % 3]] for i in range(n)])
+        node = data.cluster(workers=workers, threshold=threshold, rng=RNG(args.seed))
+        return node.order.tolist(), node.dump(), node.coords, data.tasks, data.pruned
+    (order1, shape1, coords1, tasks1, pruned1), (order2, shape2, coords2, tasks2, pruned2) = run(1), run(2)
+    if not (order1 == order2 and shape1 == shape2 and np.array_equal(coords1, coords2, equal_nan=True)
+            and pruned1 == pruned2):
+        return False
+    (order1, shape1, _, _, pruned1), (order2, shape2, _, tasks3, pruned2) = run(1, 1000, 256), run(4, 1000, 256)
+    return tasks1 == 0 and tasks2 > 0 and tasks3 > 0 and order1 == order2 and shape1 == shape2 and pruned1 == pruned2
+
+def rngFunc():
+    """
+    Function:
+        rngFunc
+    Description:
+        Callback function to test the RNG objects
+    Input:
+        None
+    Output:
+        RNG matches the original Park-Miller stream, batches match single draws and split streams are
+        reproducible and do not overlap each other or the parent over the first draws
+    """
+    seed, t = 937162211, []
+    for _ in range(5):
+        seed = (16807 * seed) % 2147483647
+        t.append(math.floor(0.5 + 9 * seed / 2147483647))
+    rng = RNG(937162211)
+    if [rng.rint(None, 9) for _ in range(5)] != t or RNG(937162211).ints(5, 9).tolist() != t:
+        return False
+    kids1, kids2 = RNG(1).split(), RNG(1).split()
+    if not ([r.rand() for r in kids1] == [r.rand() for r in kids2] and kids1[0].seed != kids1[1].seed):
+        return False
+    for seed in [1, 937162211, 2147483646]:
+        parent = RNG(seed)
+        streams = [parent] + parent.split(4)
+        seen = set()
+        for r in streams:
+            for _ in range(10000):
+                r.rand()
+                seen.add(r.seed)
+        if len(seen) != 10000 * len(streams):
+            return False
+    return True
+
+def streamFunc():
+    """
+    Function:
+        streamFunc
+    Description:
+        Callback function to test the chunked CSV loader
+    Input:
+        None
+    Output:
+        streaming the CSV gives the same rows and summaries as reading it line by line, chunks of
+        blank lines are skipped, quoted fields holding newlines are not cut between chunks and an empty
+        file raises ValueError
+    """
+    from stream import STREAM
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "t.csv")
+        with open(path, "w") as f:
+            f.write('Aa,Bb,cc\n1,2,"x\ny"\n3,4,z\n\n\n')
+        data2 = STREAM(path, 2).load()
+        if [row.cells for row in data2.rows] != [[1, 2, "x\ny"], [3, 4, "z"]]:
+            return False
+        open(path, "w").close()
+        try:
+            STREAM(path).load()
+            return False
+        except ValueError:
+            pass
+    full_path = os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv")
+    data = DATA(full_path)
+    seen = []
+    stream = STREAM(full_path, 50, lambda s: seen.append(s.rows))
+    data2 = stream.load()
+    print(stream.report())
+    return (stream.rows == len(data.rows) and stream.chunks == 8 and seen[-1] == stream.rows
+            and [row.cells for row in data.rows] == [row.cells for row in data2.rows]
+            and data.stats("mid", None, 6) == data2.stats("mid", None, 6)
+            and data.stats("div", None, 6) == data2.stats("div", None, 6))
+
+def tableFunc():
+    """
+    Function:
+        tableFunc
+    Description:
+        Callback function to test converting to and memory mapping the binary table format
+    Input:
+        None
+    Output:
+        the reopened tables have the same cells and summaries and can still grow
+    """
+    import table
+    script_dir = os.path.dirname(__file__)
+    with tempfile.TemporaryDirectory() as tmp:
+        for src, what in [("../etc/data/auto93.csv", "rows"), (args.file, "rows"), (args.file, "cols")]:
+            path = os.path.join(tmp, "t.bin")
+            data = table.convert(os.path.join(script_dir, src), path, what)
+            data2 = table.load(path)
+            if ([row.cells for row in data.rows] != [row.cells for row in data2.rows]
+                    or data.stats("mid", data.cols.x + data.cols.y, 6) != data2.stats("mid", data2.cols.x + data2.cols.y, 6)
+                    or data.stats("div", None, 6) != data2.stats("div", None, 6)):
+                return False
+            data2.add(data.rows[0].cells)
+            if data2.rows[-1].cells != data.rows[0].cells:
+                return False
+    return True
+
+def cacheFunc():
+    """
+    Function:
+        cacheFunc
+    Description:
+        Callback function to test the pairwise distance CACHE
+    Input:
+        None
+    Output:
+        the cache is off by default and then never looked up, cached distances equal the computed ones, hits and misses
+        are counted, a clone only caches its own rows and the distances are not pickled
+    """
+    import pickle
+    full_path = os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv")
+    data, data2 = DATA(full_path, config=config.CONFIG(cache=2 ** 26)), DATA(full_path)
+    if data2.cache.budget:
+        return False
+    for row1 in data.rows[:20]:
+        if data.dists(row1).tolist() != data2.dists(data2.rows[row1.i]).tolist():
+            return False
+        if data.dist(row1, data.rows[-1]) != data2.dist(data2.rows[row1.i], data2.rows[-1]):
+            return False
+    n = len(data.rows)
+    hits = data.cache.hits
+    data.add(data.rows[0].cells)
+    data.dists(data.rows[0])
+    some = data.clone(data.rows[:10])
+    some.dist(some.rows[0], some.rows[1])
+    copy = pickle.loads(pickle.dumps(data))
+    return (hits == 20 * (n + 1) and data.cache.misses == 0 and data2.cache.hits == 0
+            and data2.cache.misses == 0 and data.cache.n == n + 1 and some.cache.n == 10
+            and some.dist(some.rows[0], data.rows[20]) == some.measure(some.rows[0], [data.rows[20]], some.cols.x)[0]
+            and some.cache.misses == 1
+            and copy.cache.d is None and copy.cache.budget == 2 ** 26)
+
+def batchFunc():
+    """
+    Function:
+        batchFunc
+    Description:
+        Callback function to test batch processing of repgrid files
+    Input:
+        None
+    Output:
+        every grid is processed once, bad grids are isolated and unchanged grids are skipped
+    """
+    import batch
+    script_dir = os.path.dirname(__file__)
+    with tempfile.TemporaryDirectory() as tmp:
+        for sFile in glob.glob(os.path.join(script_dir, "../etc/data/repgrid*.json")):
+            shutil.copy(sFile, tmp)
+        with open(os.path.join(tmp, "bad.json"), "w") as f:
+            f.write("{")
+        out = os.path.join(tmp, "out.jsonl")
+        first = batch.run(tmp, out, 2)
+        second = batch.run(tmp, out, 2)
+        with open(out) as f:
+            t = [json.loads(line) for line in f]
+    print(first, second, sep="\n")
+    return (first["done"] == 5 and first["failed"] == 1 and second["done"] == 1 and second["skipped"] == 4
+            and len(t) == 5 and sum(1 for u in t if "error" in u) == 1
+            and all("error" in u or len(u["place"]) > 1 for u in t))
+
+def repviewsFunc():
+    """
+    Function:
+        repviewsFunc
+    Description:
+        Callback function to test that repRows and repCols are built without copying the ratings
+    Input:
+        None
+    Output:
+        the columns of both views share one ratings buffer and hold the grid's ratings and labels, transpose
+        is a view and the older repRows(t, transpose(t["cols"])) call gives the same rows
+    """
+    t = dofile(os.path.join(os.path.dirname(__file__), args.file))
+    rows, cols = repViews(t)
+    first, ratings = t["cols"][0], repArray(t["cols"])
+    old = repRows(t, transpose(t["cols"]))
+    return ([row.cells for row in old.rows] == [row.cells for row in rows.rows] and old.cols.names == rows.cols.names
+            and transpose(ratings).base is ratings and transpose(transpose(t["cols"])) == t["cols"]
+            and rows.store.num[0].base is not None and rows.store.num[0].base is rows.store.num[1].base
+            and cols.store.num[0].base is rows.store.num[0].base and cols.store.num[1].base is rows.store.num[0].base
+            and rows.store.column(0).tolist() == first[1:-1]
+            and cols.rows[0].cells == first[1:-1] + [first[0] + ":" + first[-1]]
+            and last(rows.rows[0].cells) == t["rows"][-1][-1])
+
+def insertFunc():
+    """
+    Function:
+        insertFunc
+    Description:
+        Callback function to test inserting rows into an existing cluster tree
+    Input:
+        None
+    Output:
+        inserting with no tree fails without adding the row, inserted rows reach a leaf, every node
+        still holds its children's rows and stale subtrees are reclustered
+    """
+    import tree
+    data = DATA(os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv"))
+    new = [row.cells for row in data.rows[300:]]
+    data = data.clone(data.rows[:300])
+    try:
+        data.insert(new[0])
+        return False
+    except ValueError:
+        if len(data.rows) != 300:
+            return False
+    tree = data.cluster(data.rows[:], rng=RNG(args.seed))
+    data.tree = tree
+    leaves = []
+    def ok(node):
+        if "left" not in node:
+            leaves.append(node)
+            return True
+        return (sorted(row.i for row in node.rows) == sorted(row.i for row in node["left"].rows + node["right"].rows)
+                and ok(node["left"]) and ok(node["right"]))
+    tree["data"]
+    for t in new[:40]:
+        data.insert(t, stale=1)
+    if not (ok(tree) and len(tree.rows) == 340 and len(tree["data"].rows) == 340):
+        return False
+    for t in new[40:]:
+        data.insert(t, stale=0.1)
+    leaves = []
+    return ok(tree) and len(tree.rows) == len(data.rows) and sum(len(node.rows) for node in leaves) == len(data.rows)
+
+def treeFunc():
+    """
+    Function:
+        treeFunc
+    Description:
+        Callback function to test saving and reloading cluster and sway trees
+    Input:
+        None
+    Output:
+        the reloaded trees have the same rows, poles, splits and coords as the saved ones, and the file is strict json
+    """
+    import tree
+    data = DATA(os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv"))
+    def same(node1, node2):
+        if node1 is None or node2 is None:
+            return node1 is node2
+        return (sorted(row.i for row in node1.rows) == sorted(row.i for row in node2.rows)
+                and [node1.get(k) for k in ["A", "B", "mid", "C"]] == [node2.get(k) for k in ["A", "B", "mid", "C"]]
+                and node2.stats == tree.stats(node1)
+                and same(node1.left, node2.left) and same(node1.right, node2.right))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tree.jsonl")
+        root = data.cluster(rng=RNG(args.seed))
+        for t in [[8, 400, 150, 4000, 12, 75, 1, 20], [4, 100, 70, 2000, 18, 80, 3, 40]]:
+            data.insert(t)
+        for node in [root, data.sway(None, 0.5, rng=RNG(args.seed))]:
+            tree.save(node, path)
+            with open(path) as f:
+                if "NaN" in f.read():
+                    return False
+            if not (same(node, tree.load(path, data)) and np.array_equal(node.coords, tree.load(path, data).coords, equal_nan=True)):
+                return False
+    return True
+
+def swayFunc():
+    """
+    Function:
+        swayFunc
+    Description:
+        Callback function to test sway, with and without sampled poles and budgets
+    Input:
+        None
+    Output:
+        sway keeps halving to the smallest cluster, spends one better per level and respects its budgets
+    """
+    data = DATA(os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv"))
+    def leaf(node):
+        return leaf(node["left"]) if "left" in node else node
+    full = data.sway(rng=RNG(args.seed))
+    fast = data.sway(rng=RNG(args.seed), sample=32)
+    short = data.sway(rng=RNG(args.seed), sample=32, evals=2)
+    n = len(data.rows)
+    print(full.evals, leaf(full)["data"].stats("mid", None, 2))
+    print(fast.evals, leaf(fast)["data"].stats("mid", None, 2))
+    print(short.evals, leaf(short)["data"].stats("mid", None, 2))
+    return (len(leaf(full).rows) <= 2 * n ** args.min < 2 * len(leaf(full).rows) + 2
+            and full.evals == fast.evals and short.evals == 2 and len(leaf(short).rows) == n - n // 2 - (n - n // 2) // 2)
+
+def bettersFunc():
+    """
+    Function:
+        bettersFunc
+    Description:
+        Callback function to test vectorized domination against better
+    Input:
+        None
+    Output:
+        betters matches better on every pair and rank orders rows by how many they dominate
+    """
+    data = DATA(os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv"))
+    rows = data.rows[:60]
+    m = data.betters(rows)
+    if m.tolist() != [[data.better(row1, row2) for row2 in rows] for row1 in rows]:
+        return False
+    t = data.rank(rows, block=7)
+    wins = [n for _, n in t]
+    return wins == sorted(wins, reverse=True) and all(n == sum(data.better(row, row2) for row2 in rows) for row, n in t)
+
+def benchFunc():
+    """
+    Function:
+        benchFunc
+    Description:
+        Callback function to test the benchmark suite
+    Input:
+        None
+    Output:
+        Every step listed in bench.SUITE is timed and compare flags only the steps that got slower
+    """
+    import bench
+    t = bench.synthetic(rows=50, missing=0.1)
+    if len(t) != 51 or sum("?" in u for u in t[1:]) == 0:
+        return False
+    old = bench.run(rows=50, repeats=1)
+    new = deepcopy(old)
+    new["results"]["auto93.sway"] *= 2
+    flagged = [k for k, _, _, _, flag in bench.compare(old, new) if flag]
+    return list(old["results"]) == bench.SUITE and all(t > 0 for t in old["results"].values()) and flagged == ["auto93.sway"]
+
+def probeFunc():
+    """
+    Function:
+        probeFunc
+    Description:
+        Callback function to test the instrumentation layer
+    Input:
+        None
+    Output:
+        Hot paths are counted while probes are on, splits are counted at the depth they happen and the
+        original methods come back when they are off
+    """
+    import probe
+    on = bool(probe.saved)
+    dist = DATA.dist
+    probe.enable(report=False)
+    probe.reset()
+    data = DATA(os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv"))
+    root = data.sway(rng=RNG(args.seed))
+    data.clone(data.rows[:10])
+    counts = dict(probe.counts)
+    print(probe.summary())
+    probe.reset()
+    data.cluster(data.rows[:37], rng=RNG(args.seed))
+    splits = {int(k.split()[-1]): n for k, n in probe.counts.items() if k.startswith("DATA.half depth")}
+    if not on:
+        probe.disable()
+    return counts["DATA.clone"] == 10 and counts["DATA.better"] > 0 and counts["NUM.dists"] > 0 and \
+        all(counts["DATA.half depth " + str(d)] == 1 for d in range(root.evals)) and \
+        sum(splits.values()) == 36 and all(n <= 2 ** d for d, n in splits.items()) and max(splits) == 5 and \
+        (on or DATA.dist is dist)
+
+def indexFunc():
+    """
+    Function:
+        indexFunc
+    Description:
+        Callback function to test the nearest neighbour index
+    Input:
+        None
+    Output:
+        Exact queries agree with nearest while measuring fewer rows, checks caps the work per query
+        and asking for no rows returns none, like nearest
+    """
+    from index import INDEX
+    data = DATA(os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv"))
+    index = INDEX(data, rng=RNG(args.seed)).build()
+    rows = data.rows[:30]
+    for got, want in zip(index.queries(rows, 5), [data.nearest(row, 5) for row in rows]):
+        if [round(d, 12) for _, d in got] != [round(d, 12) for _, d in want]:
+            return False
+    exact, index.evals = index.evals, 0
+    index.queries(rows, 5, checks=20)
+    print("exact", exact / len(rows), "capped", index.evals / len(rows), "rows", len(data.rows))
+    return exact < len(rows) * len(data.rows) / 2 and index.evals <= 20 * len(rows) and \
+        index.query(data.rows[3].cells, 1)[0][1] == 0 and index.query(data.rows[3], 0) == data.nearest(data.rows[3], 0) == []
+
+def pruneFunc():
+    """
+    Function:
+        pruneFunc
+    Description:
+        Callback function to test reusing and bounding pole distances
+    Input:
+        None
+    Output:
+        cluster builds the same tree as recursive half calls while skipping distances, furthest finds
+        the same rows with the triangle inequality bounds, and skips them on tables with "?" cells
+    """
+    import bench
+    sFile = os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv")
+    data1, data2 = DATA(sFile), DATA(sFile)
+    def shape(node):
+        return [row.i for row in node.rows] if node.left is None else [node.A.i, node.B.i, shape(node.left), shape(node.right)]
+    def grow(rows, above, rng):
+        if len(rows) < 2:
+            return [row.i for row in rows]
+        left, right, A, B, _, _ = data2.half(rows, None, above, rng)
+        return [A.i, B.i, grow(left, A, rng), grow(right, B, rng)]
+    if shape(data1.cluster(rng=RNG(args.seed))) != grow(data2.rows, None, RNG(args.seed)):
+        return False
+    print("cluster pruned", data1.pruned, "distances")
+    rows, data1.pruned = data1.rows, 0
+    poles = [(rows[5], data1.dists(rows[5], rows)), (rows[9], data1.dists(rows[9], rows))]
+    for row in rows[::20]:
+        if data1.furthest(row, rows, poles=poles) is not data1.furthest(row, rows):
+            return False
+    print("furthest pruned", data1.pruned, "of", len(rows) * len(rows[::20]), "distances")
+    if data1.pruned == 0:
+        return False
+    data3 = DATA(bench.synthetic(rows=200, missing=0.2))
+    rows = data3.rows
+    poles = [(rows[5], data3.dists(rows[5], rows)), (rows[9], data3.dists(rows[9], rows))]
+    for row in rows[::20]:
+        if data3.furthest(row, rows, poles=poles) is not data3.furthest(row, rows):
+            return False
+    return data3.pruned == 0
+
+def libraryFunc():
+    """
+    Function:
+        libraryFunc
+    Description:
+        Callback function to test using DATA as a library, without the CLI
+    Input:
+        None
+    Output:
+        Importing data loads none of the CLI modules, importing testfile registers no examples
+        and each DATA follows its own CONFIG
+    """
+    import subprocess
+    import sys
+    def run(code):
+        return subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(__file__) or ".",
+                              capture_output=True, text=True, check=True).stdout.strip()
+    loaded = run("import sys, data; print([m for m in ['utility', 'testfile', 'argparse', 'batch'] if m in sys.modules])")
+    print("modules loaded by import data:", loaded)
+    if run("import testfile, utility; print(len(utility.egs))") != "0":
+        return False
+    sFile = os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv")
+    data1, data2 = DATA(sFile, config=config.CONFIG(p=1)), DATA(sFile, config=config.CONFIG(p=3))
+    row1, row2 = data1.rows[0], data1.rows[1]
+    d1 = sum(col.dist(row1.cell(col.at), row2.cell(col.at)) for col in data1.cols.x) / len(data1.cols.x)
+    return loaded == "[]" and abs(data1.dist(row1, row2) - d1) < 10 ** -12 and \
+        data1.clone(data1.rows).config is data1.config and data2.dist(data2.rows[0], data2.rows[1]) != data1.dist(row1, row2)
+
+def serverFunc():
+    """
+    Function:
+        serverFunc
+    Description:
+        Callback function to test the clustering server
+    Input:
+        None
+    Output:
+        Concurrent requests get the same answers as direct calls, repeats come from the cache, bad
+        parameters get a 400, file locks stay bounded, repgrid views get the config and latencies are reported
+    """
+    import asyncio
+    from server import SERVER, fetch
+    here = os.path.dirname(__file__) or "."
+    csv, grid = os.path.join(here, "../etc/data/auto93.csv"), os.path.join(here, "../etc/data/repgrid1.json")
+    service = SERVER(size=3)
+    async def run(sPath):
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            got = await asyncio.gather(fetch(f"/nearest?file={csv}&row=3&k=4", port=port),
+                                       fetch(f"/cluster?file={csv}&seed=1", port=port),
+                                       fetch(f"/sway?file={csv}", port=port),
+                                       fetch(f"/place?file={grid}", port=port),
+                                       fetch(f"/cluster?file={csv}&seed=1", port=port),
+                                       fetch("/nope", port=port),
+                                       fetch(f"/nearest?file={csv}&cells=5", port=port))
+        unix = await service.start(path=sPath)
+        async with unix:
+            got.append(await fetch("/metrics", path=sPath))
+        return got
+    with tempfile.TemporaryDirectory() as tmp:
+        got = asyncio.run(run(os.path.join(tmp, "grid.sock")))
+    print(got[-1][1])
+    data = DATA(csv)
+    want = [r.i for r, _ in data.nearest(data.rows[3], 4)]
+    metrics = got[-1][1]
+    cfg = config.CONFIG(cache=2 ** 20)
+    rows, cols = repViews(json.load(open(grid)), cfg)
+    return [status for status, _ in got] == [200, 200, 200, 200, 200, 404, 400, 200] and len(service.locks) <= 3 and \
+        rows.config is cfg and cols.config is cfg and rows.cache.budget == cfg.cache and \
+        [t["row"] for t in got[0][1]] == want and got[1][1] == got[4][1] and got[1][1]["n"] == len(data.rows) and \
+        metrics["cache"]["hits"] >= 3 and metrics["cache"]["evictions"] >= 1 and metrics["routes"]["cluster"]["requests"] == 2 and metrics["routes"]["nearest"]["requests"] == 2
+
+def memoryFunc():
+    """
+    Function:
+        memoryFunc
+    Description:
+        Callback function to test slotted ROW, NUM and SYM and the DATA memory report
+    Input:
+        None
+    Output:
+        Rows, cols and cells have no per instance dictionary and the report adds up, growing with the tree
+    """
+    data = DATA(os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv"))
+    before = data.memory()
+    data.cluster(rng=RNG(args.seed))
+    after = data.memory()
+    print(before, after, sep="\n")
+    return sum(hasattr(x, "__dict__") for x in [data.rows[0]] + data.cols.all) == 0 and \
+        after["total"] == sum(v for k, v in after.items() if k != "total") and \
+        before["tree"] == 0 < after["tree"] and before["rows"] == after["rows"] < 100 * len(data.rows)
+
+def coordsFunc():
+    """
+    Function:
+        coordsFunc
+    Description:
+        Callback function to test the per depth projections kept with cluster trees
+    Input:
+        None
+    Output:
+        Reclustering a DATA gives the same float32 coords as clustering a fresh one, and deeper levels place rows again without reclustering
+    """
+    sFile = os.path.join(os.path.dirname(__file__), "../etc/data/auto93.csv")
+    data = DATA(sFile)
+    data.cluster(rng=RNG(1))
+    again = data.cluster(rng=RNG(args.seed)).coords
+    fresh = DATA(sFile).cluster(rng=RNG(args.seed)).coords
+    xy0, xy3 = data.tree.xy(0), data.tree.xy(3)
+    data.insert(data.rows[5].cells)
+    print("coords", again.shape, "root pole at", xy0[data.tree.A.i].tolist())
+    return np.array_equal(again, fresh, equal_nan=True) and again.dtype == np.float32 and not np.isnan(xy0).any() and \
+        xy0[data.tree.A.i, 0] == 0 and not np.array_equal(xy0, xy3) and len(data.tree.xy()) == len(data.rows)
+
+def placeFunc():
+    """
+    Function:
+        placeFunc
+    Description:
+        Callback function to test the placement renderer
+    Input:
+        None
+    Output:
+        Labels go past Z, collisions are counted, the bottom row is drawn and every format is written
+    """
+    import place
+    if [place.label(k) for k in [0, 25, 26, 701, 702]] != ["A", "Z", "AA", "ZZ", "AAA"]:
+        return False
+    rng = RNG(args.seed)
+    xy = np.array([[rng.rand(0, 1), rng.rand(0, 1)] for _ in range(10000)] + [[1, 1], [0.5, np.nan]])
+    counts, first = place.bins(xy, 10)
+    if counts.sum() != 10001 or counts[10, 10] < 1 or first[10, 10] < 0:
+        return False
+    text = place.asText(*place.bins(np.vstack([xy[:60], [[1, 1]]]), 4), list(range(61)), legend=False)
+    print(text)
+    with tempfile.TemporaryDirectory() as tmp:
+        for what in ["csv", "ppm", "svg"]:
+            place.render(xy, range(len(xy)), what, 10, os.path.join(tmp, "grid." + what))
+        with open(os.path.join(tmp, "grid.ppm"), "rb") as f:
+            ppm = f.read()
+        with open(os.path.join(tmp, "grid.csv")) as f:
+            lines = f.read().splitlines()
+    return ppm.startswith(b"P6 88 88 255\n") and len(ppm) == len(b"P6 88 88 255\n") + 88 * 88 * 3 and \
+        len(lines) == 1 + (counts > 0).sum() and len(text.splitlines()) == 5 and "*" not in text
 
 def getCliArgs():
     """
@@ -366,7 +1051,6 @@ def getCliArgs():
         None
     """
     global args
-    global Seed
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument("-d", "--dump", type=bool, default=False, required=False, help="on crash, dump stack")
     parser.add_argument("-g", "--go", type=str, default="all", required=False, help="start-up action")
@@ -374,9 +1058,16 @@ def getCliArgs():
     parser.add_argument("-s", "--seed", type=int, default=937162211, required=False, help="random number seed")
     parser.add_argument("-f", "--file", type=str, default="../etc/data/repgrid1.json", required=False, help="name of file")
     parser.add_argument("-p", "--p", type=int, default=2, required=False, help="distance coefficient")
+    parser.add_argument("-m", "--min", type=float, default=0.5, required=False, help="size of smallest cluster")
+    parser.add_argument("-P", "--probe", action='store_true', help="count and time hot paths")
+    parser.add_argument("--profile", type=str, default=None, required=False, help="write cProfile stats to file")
 
     args = parser.parse_args()
-    Seed = args.seed
+    config.the.update(args)
+    Rng.seed = args.seed
+    if args.probe or args.profile:
+        import probe
+        probe.enable(args.profile)
 
 def printCLIvalues():
     """
@@ -395,25 +1086,9 @@ def printCLIvalues():
     cli_args["help"] = args.help
     cli_args["seed"] = args.seed
     cli_args["file"] = args.file
+    cli_args["min"] = args.min
     print(cli_args)
 
-def readCSV(sFilename, fun):
-    """
-    Function:
-        readCSV
-    Description:
-        reads a CSV and runs a callback function on every line
-    Input:
-        sFilename - path of CSV file to be read
-        fun - callback function to be called for each line in the CSV
-    Output:
-        None
-    """
-    with open(sFilename, mode='r') as file:
-        csvFile = csv.reader(file)
-        for line in csvFile:
-            fun(line)
-
 def repColsFunc():
     """
     Function:
@@ -430,9 +1105,9 @@ def repColsFunc():
     rawData = dofile(full_path)
     t = repCols(rawData["cols"])
     for col in t.cols.all:
-        print(vars(col))
+        print(attributes(col))
     for row in t.rows:
-        print(vars(row))
+        print({"cells": row.cells})
 
 def synonymsFunc():
     """
@@ -463,11 +1138,11 @@ def reprowsFunc():
     script_dir = os.path.dirname(__file__)
     full_path = os.path.join(script_dir, args.file)
     t = dofile(full_path)
-    rows = repRows(t, transpose(t["cols"]))
+    rows = repRows(t)
     for col in rows.cols.all:
-        print(vars(col))
+        print(attributes(col))
     for row in rows.rows:
-        print(vars(row))
+        print({"cells": row.cells})
 
 def copyFunc():
     """
@@ -499,7 +1174,7 @@ def prototypesFunc():
     script_dir = os.path.dirname(__file__)
     full_path = os.path.join(script_dir, args.file)
     t = dofile(full_path)
-    rows = repRows(t, transpose(t["cols"]))
+    rows = repRows(t)
     show(rows.cluster())
 
 def positionFunc():
@@ -516,7 +1191,7 @@ def positionFunc():
     script_dir = os.path.dirname(__file__)
     full_path = os.path.join(script_dir, args.file)
     t = dofile(full_path)
-    rows = repRows(t, transpose(t["cols"]))
+    rows = repRows(t)
     rows.cluster()
     repPlace(rows)
 